@@ -5,6 +5,8 @@ LOG_LEVEL = 2
 LOG_HANDLERS = ["Console", "File"]
 # Max log file size in bytes, there will be a maximum of 2 files at this size created
 LOG_FILE_MAX_SIZE = 10240
+# Log output is buffered and written once this many bytes are pending, or every 100ms, whichever comes first
+LOG_BUFFER_SIZE = 512
 
 ## WIFI
 WIFI_SSID = ""
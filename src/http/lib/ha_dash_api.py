@@ -5,6 +5,7 @@ This module defines the REST API endpoints for interacting with HA-Dash.
 All API routes are registered with the web server and handle configuration,
 status, and control operations.
 """
+from json import dumps
 from lib.ulogging import uLogger
 
 try:
@@ -16,6 +17,8 @@ if TYPE_CHECKING:
     from webserver import WebServer
     from lib.ha_dash import HADash
 
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 
 class HADashAPI:
     """API endpoints for HA-Dash configuration and control."""
@@ -33,30 +36,36 @@ class HADashAPI:
         self.app = web_server.get_app()
         self.ha_dash = ha_dash
         
+        # Constant response bodies are serialized once rather than on every request
+        self._status_body = dumps({'status': 'running', 'version': '1.0.0'}).encode()
+        self._config_body = dumps({'message': 'Configuration endpoint - coming soon'}).encode()
+        self._config_update_body = dumps({'message': 'Configuration update endpoint - coming soon'}).encode()
+        
         self.logger.info("HA-Dash API initialized")
     
     def register_routes(self) -> None:
         """Register all API routes with the web server."""
         self.logger.info("Registering API routes...")
         
-        @self.app.route('/api/status')
-        async def api_status(request):
-            """Get the current HA-Dash status."""
-            self.logger.info("API: Get status")
-            return {'status': 'running', 'version': '1.0.0'}, 200, {'Content-Type': 'application/json'}
-        
-        @self.app.route('/api/config')
-        async def api_get_config(request):
-            """Get the current HA-Dash configuration."""
-            self.logger.info("API: Get config")
-            # TODO: Implement config retrieval
-            return {'message': 'Configuration endpoint - coming soon'}, 200, {'Content-Type': 'application/json'}
-        
-        @self.app.route('/api/config', methods=['POST'])
-        async def api_update_config(request):
-            """Update the HA-Dash configuration."""
-            self.logger.info("API: Update config")
-            # TODO: Implement config update
-            return {'message': 'Configuration update endpoint - coming soon'}, 200, {'Content-Type': 'application/json'}
+        self.app.route('/api/status')(self._api_status)
+        self.app.route('/api/config')(self._api_get_config)
+        self.app.route('/api/config', methods=['POST'])(self._api_update_config)
         
         self.logger.info("API routes registered")
+    
+    async def _api_status(self, request):
+        """Get the current HA-Dash status."""
+        self.logger.info("API: Get status")
+        return self._status_body, 200, _JSON_HEADERS
+    
+    async def _api_get_config(self, request):
+        """Get the current HA-Dash configuration."""
+        self.logger.info("API: Get config")
+        # TODO: Implement config retrieval
+        return self._config_body, 200, _JSON_HEADERS
+    
+    async def _api_update_config(self, request):
+        """Update the HA-Dash configuration."""
+        self.logger.info("API: Update config")
+        # TODO: Implement config update
+        return self._config_update_body, 200, _JSON_HEADERS
@@ -0,0 +1,77 @@
+"""
+HA-Dash URL Path Checks
+
+This module validates static file paths taken from request URLs. It has no
+MicroPython-only dependencies so it can be tested under CPython.
+"""
+import re
+
+# Matches absolute paths, drive letters, backslashes and any '.' or '..' path
+# component - none of which are valid in a static file request
+_UNSAFE_PATH = re.compile(r'^/|^.:|\\|(^|/)\.\.?(/|$)')
+
+_HEX_DIGITS = '0123456789abcdefABCDEF'
+
+
+def url_decode(text: str) -> str:
+    """
+    Decode URL-encoded text to prevent encoded traversal sequences.
+
+    Args:
+        text: URL-encoded text
+
+    Returns:
+        str: Decoded text
+    """
+    # Handle multiple rounds of encoding, only while escapes remain
+    decoded = text
+    for _ in range(3):  # Limit iterations to prevent infinite loops
+        i = decoded.find('%')
+        if i == -1:
+            break
+        # Copy the runs between escapes as whole slices
+        result = []
+        start = 0
+        length = len(decoded)
+        while i != -1 and i + 2 < length:
+            # int() would also accept signs and spaces, so check for two hex digits first
+            if decoded[i+1] not in _HEX_DIGITS or decoded[i+2] not in _HEX_DIGITS:
+                i = decoded.find('%', i + 1)
+                continue
+            result.append(decoded[start:i])
+            result.append(chr(int(decoded[i+1:i+3], 16)))
+            start = i + 3
+            i = decoded.find('%', start)
+        if start == 0:
+            # No valid escapes, fully decoded
+            break
+        result.append(decoded[start:])
+        decoded = ''.join(result)
+    return decoded
+
+
+def is_safe_path(path: str) -> bool:
+    """
+    Validate that a path is safe and doesn't contain directory traversal sequences.
+    The raw path is checked first, then the URL-decoded path if it contains escapes.
+
+    Args:
+        path: The path to validate (from URL route parameter)
+
+    Returns:
+        bool: True if path is safe, False otherwise
+    """
+    # Reject empty paths
+    if not path:
+        return False
+
+    if '\x00' in path or _UNSAFE_PATH.search(path):
+        return False
+
+    # URL-decode the path to catch encoded traversal attempts
+    if '%' in path:
+        decoded_path = url_decode(path)
+        if '\x00' in decoded_path or _UNSAFE_PATH.search(decoded_path):
+            return False
+
+    return True
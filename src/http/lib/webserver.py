@@ -4,14 +4,42 @@ HA-Dash Web Server
 This module provides the Microdot web server setup for hosting the HA-Dash
 configuration interface and API endpoints.
 """
-from http.lib.microdot import Microdot, send_file
-from lib.ulogging import uLogger
+from io import BytesIO
+from json import dumps
+from os import stat
+from http.lib.microdot import Microdot, Response, send_file
+from http.lib.url_path import is_safe_path
+from lib.ulogging import uLogger, flush as flush_logs
 
 try:
     from typing import TYPE_CHECKING
 except ImportError:
     TYPE_CHECKING = False
 
+# Content types for image files, keyed by lowercase file extension
+_IMAGE_CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'svg': 'image/svg+xml',
+}
+
+# Constant JSON error responses, serialized once at import
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+_INVALID_PATH_BODY = dumps({'error': 'Invalid path'}).encode()
+_NOT_FOUND_BODY = dumps({'error': 'Not found'}).encode()
+_INTERNAL_ERROR_BODY = dumps({'error': 'Internal server error'}).encode()
+
+# Static files up to this size are kept in RAM after the first request, up to
+# the total cache budget
+_FILE_CACHE_MAX_FILE_BYTES = 8192
+_FILE_CACHE_MAX_TOTAL_BYTES = 32768
+
+# Browser cache lifetime for css/js/img assets. The index page always
+# revalidates so that a firmware update is picked up on the next load.
+_ASSET_MAX_AGE_SECONDS = 3600
+
 class WebServer:
     """Web server for hosting the HA-Dash configuration interface."""
     
@@ -24,6 +52,15 @@ class WebServer:
         """
         self.logger = uLogger("WebServer")
         self.http_dir = http_dir
+        self._index_file = http_dir + 'index.html'
+        self._favicon_file = http_dir + 'img/ha_logo.png'
+        self._css_dir = http_dir + 'css/'
+        self._js_dir = http_dir + 'js/'
+        self._img_dir = http_dir + 'img/'
+        self._file_cache = {}  # {filename: bytes}
+        self._file_cache_bytes = 0
+        self._etags = {}  # {filename: etag}
+        self._gzip_available = {}  # {filename: bool}
         self.app = Microdot()
         self.host = '0.0.0.0'
         self.port = 80
@@ -34,181 +71,131 @@ class WebServer:
         
         self.logger.info("Web server initialized")
     
-    def _url_decode(self, text: str) -> str:
+    def _has_gzip_variant(self, filename: str) -> bool:
         """
-        Decode URL-encoded text to prevent encoded traversal sequences.
+        Check whether a precompressed .gz copy of a static file exists,
+        remembering the result so flash is only checked once per file. Results
+        are only remembered for files that exist, so requests for made up
+        names cannot grow the cache.
         
         Args:
-            text: URL-encoded text
+            filename: Full path of the uncompressed file
             
         Returns:
-            str: Decoded text
+            bool: True if filename + '.gz' exists
         """
-        # Handle multiple rounds of encoding
-        decoded = text
-        for _ in range(3):  # Limit iterations to prevent infinite loops
-            prev = decoded
-            result = []
-            i = 0
-            while i < len(decoded):
-                if decoded[i] == '%' and i + 2 < len(decoded):
-                    try:
-                        hex_chars = decoded[i+1:i+3]
-                        char_code = int(hex_chars, 16)
-                        result.append(chr(char_code))
-                        i += 3
-                    except (ValueError, OverflowError):
-                        result.append(decoded[i])
-                        i += 1
-                else:
-                    result.append(decoded[i])
-                    i += 1
-            decoded = ''.join(result)
-            # Stop if no more changes (fully decoded)
-            if decoded == prev:
-                break
-        return decoded
+        available = self._gzip_available.get(filename)
+        if available is None:
+            try:
+                stat(filename + '.gz')
+                available = True
+            except OSError:
+                try:
+                    stat(filename)
+                except OSError:
+                    return False
+                available = False
+            self._gzip_available[filename] = available
+        return available
     
-    def _normalize_path(self, path: str) -> str:
+    def _send_static_file(self, request, filename: str, content_type: str | None = None,
+                          max_age: int = _ASSET_MAX_AGE_SECONDS):
         """
-        Normalize a path by resolving . and .. components.
+        Send a static file with ETag validation, serving small files from an
+        in-memory cache to avoid re-reading flash on every request. A
+        precompressed filename.gz is sent instead when present and the client
+        accepts gzip.
         
         Args:
-            path: The path to normalize
+            request: The incoming request, checked for If-None-Match and Accept-Encoding
+            filename: Full path of the file to send
+            content_type: Optional content type, derived from the extension if omitted
+            max_age: Cache-Control max-age in seconds, 0 to always revalidate
             
         Returns:
-            str: Normalized path
+            Response: 304 if the client copy is current, else the file contents
         """
-        # Split path into components
-        parts = path.replace('\\', '/').split('/')
-        normalized = []
-        
-        for part in parts:
-            if part == '.' or part == '':
-                # Skip current directory references and empty parts
-                continue
-            elif part == '..':
-                # Move up one directory if possible
-                if normalized:
-                    normalized.pop()
-            else:
-                # Normal path component
-                normalized.append(part)
-        
-        return '/'.join(normalized)
-    
-    def _is_safe_path(self, path: str) -> bool:
-        """
-        Validate that a path is safe and doesn't contain directory traversal sequences.
-        Uses defense-in-depth approach with multiple validation layers.
-        
-        Args:
-            path: The path to validate (from URL route parameter)
-            
-        Returns:
-            bool: True if path is safe, False otherwise
-        """
-        # Reject empty paths
-        if not path:
-            return False
-        
-        # Reject paths with null bytes
-        if '\x00' in path:
-            return False
-        
-        # Reject absolute paths
-        if path.startswith('/') or (len(path) > 1 and path[1] == ':'):
-            return False
-        
-        # URL-decode the path to catch encoded traversal attempts
-        decoded_path = self._url_decode(path)
-        
-        # Check decoded path for null bytes again
-        if '\x00' in decoded_path:
-            return False
-        
-        # Normalize the path to resolve . and .. components
-        normalized = self._normalize_path(decoded_path)
-        
-        # After normalization, path should not be empty (would indicate traversal to root)
-        if not normalized:
-            return False
-        
-        # After normalization, path should not start with .. (would escape base directory)
-        if normalized.startswith('..'):
-            return False
-        
-        # Verify no .. components remain in the normalized path
-        if '..' in normalized.split('/'):
-            return False
-        
-        # Additional check: ensure path doesn't contain suspicious patterns
-        suspicious_patterns = ['..\\', '/../', '\\..', '../']
-        for pattern in suspicious_patterns:
-            if pattern in path or pattern in decoded_path:
-                return False
-        
-        return True
+        compressed = 'gzip' in request.headers.get('Accept-Encoding', '') and \
+            self._has_gzip_variant(filename)
+        source = filename + '.gz' if compressed else filename
+        
+        etag = self._etags.get(source)
+        if etag is None:
+            # First request for this file: stat it once for the ETag and cache it if small enough
+            file_stat = stat(source)
+            size = file_stat[6]
+            etag = f'"{size:x}-{file_stat[8]:x}"'
+            self._etags[source] = etag
+            if size <= _FILE_CACHE_MAX_FILE_BYTES and \
+                    self._file_cache_bytes + size <= _FILE_CACHE_MAX_TOTAL_BYTES:
+                with open(source, 'rb') as f:
+                    self._file_cache[source] = f.read()
+                self._file_cache_bytes += size
+                if self.logger.info_enabled:
+                    self.logger.info(f"Cached static file {source} ({size} bytes)")
+        
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status_code=304, headers={'ETag': etag, 'Vary': 'Accept-Encoding'})
+        
+        data = self._file_cache.get(source)
+        stream = BytesIO(data) if data is not None else None
+        response = send_file(filename, content_type=content_type, stream=stream, max_age=max_age,
+                             compressed=compressed, file_extension='.gz' if compressed else '')
+        response.headers['ETag'] = etag
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
     
     def _register_static_routes(self) -> None:
         """Register routes for serving static files."""
-        
-        @self.app.route('/')
-        async def index(request):
-            """Serve the main index.html page."""
-            return send_file(self.http_dir + 'index.html')
-        
-        @self.app.route('/favicon.ico')
-        async def favicon(request):
-            """Serve the favicon."""
-            return send_file(self.http_dir + 'img/ha_logo.png', content_type='image/png')
-        
-        @self.app.route('/css/<path:path>')
-        async def css(request, path):
-            """Serve CSS files."""
-            if not self._is_safe_path(path):
-                return {'error': 'Invalid path'}, 400
-            return send_file(self.http_dir + 'css/' + path)
-        
-        @self.app.route('/js/<path:path>')
-        async def js(request, path):
-            """Serve JavaScript files."""
-            if not self._is_safe_path(path):
-                return {'error': 'Invalid path'}, 400
-            return send_file(self.http_dir + 'js/' + path)
-        
-        @self.app.route('/img/<path:path>')
-        async def img(request, path):
-            """Serve image files."""
-            if not self._is_safe_path(path):
-                return {'error': 'Invalid path'}, 400
-            
-            # Determine content type based on extension
-            if path.endswith('.png'):
-                content_type = 'image/png'
-            elif path.endswith('.jpg') or path.endswith('.jpeg'):
-                content_type = 'image/jpeg'
-            elif path.endswith('.gif'):
-                content_type = 'image/gif'
-            elif path.endswith('.svg'):
-                content_type = 'image/svg+xml'
-            else:
-                content_type = 'application/octet-stream'
-            
-            return send_file(self.http_dir + 'img/' + path, content_type=content_type)
+        self.app.route('/')(self._index)
+        self.app.route('/favicon.ico')(self._favicon)
+        self.app.route('/css/<path:path>')(self._css)
+        self.app.route('/js/<path:path>')(self._js)
+        self.app.route('/img/<path:path>')(self._img)
     
     def _register_error_handlers(self) -> None:
         """Register error handlers."""
+        self.app.errorhandler(404)(self._not_found)
+        self.app.errorhandler(500)(self._internal_error)
+    
+    async def _index(self, request):
+        """Serve the main index.html page."""
+        return self._send_static_file(request, self._index_file, max_age=0)
+    
+    async def _favicon(self, request):
+        """Serve the favicon."""
+        return self._send_static_file(request, self._favicon_file, content_type='image/png')
+    
+    async def _css(self, request, path):
+        """Serve CSS files."""
+        if not is_safe_path(path):
+            return _INVALID_PATH_BODY, 400, _JSON_HEADERS
+        return self._send_static_file(request, self._css_dir + path)
+    
+    async def _js(self, request, path):
+        """Serve JavaScript files."""
+        if not is_safe_path(path):
+            return _INVALID_PATH_BODY, 400, _JSON_HEADERS
+        return self._send_static_file(request, self._js_dir + path)
+    
+    async def _img(self, request, path):
+        """Serve image files."""
+        if not is_safe_path(path):
+            return _INVALID_PATH_BODY, 400, _JSON_HEADERS
         
-        @self.app.errorhandler(404)
-        async def not_found(request):
-            """Handle 404 errors."""
-            return {'error': 'Not found'}, 404
+        # Determine content type based on extension
+        extension = path[path.rfind('.') + 1:].lower()
+        content_type = _IMAGE_CONTENT_TYPES.get(extension, 'application/octet-stream')
         
-        @self.app.errorhandler(500)
-        async def internal_error(request):
-            """Handle 500 errors."""
-            return {'error': 'Internal server error'}, 500
+        return self._send_static_file(request, self._img_dir + path, content_type=content_type)
+    
+    async def _not_found(self, request):
+        """Handle 404 errors."""
+        return _NOT_FOUND_BODY, 404, _JSON_HEADERS
+    
+    async def _internal_error(self, request):
+        """Handle 500 errors."""
+        return _INTERNAL_ERROR_BODY, 500, _JSON_HEADERS
     
     def get_app(self) -> Microdot:
         """
@@ -233,6 +220,7 @@ class WebServer:
             self.port = port
             
         self.logger.info(f"Starting web server on {self.host}:{self.port}")
+        flush_logs()
         try:
             await self.app.start_server(host=self.host, port=self.port)
         except Exception as e:
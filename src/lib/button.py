@@ -3,7 +3,7 @@ Classes relating to button use and management, leveraging asyncio Events to
 signal button presses.
 """
 
-from asyncio import Event, sleep
+from asyncio import Event, ThreadSafeFlag, sleep
 from re import sub
 
 from machine import Pin
@@ -17,36 +17,59 @@ class Button:
     """
 
     def __init__(
-        self, gpio_pin: int, button_name: str, button_pressed_event: Event
+        self,
+        gpio_pin: int,
+        button_name: str,
+        button_pressed_event: Event,
+        debounce_ms: int = 20,
     ) -> None:
         self.logger = uLogger(f"Button {gpio_pin}")
         self.gpio = gpio_pin
         self.pin = Pin(gpio_pin, Pin.IN, Pin.PULL_UP)
         self.name = button_name
         self.button_pressed = button_pressed_event
+        self.debounce_ms = debounce_ms
+        # Set from the pin interrupt so the watcher can sleep until the pin changes
+        self.pin_changed = ThreadSafeFlag()
+        self.pin.irq(
+            lambda pin: self.pin_changed.set(), Pin.IRQ_FALLING | Pin.IRQ_RISING
+        )
 
     async def wait_for_press(self) -> None:
         """
         Button press watcher, which will wait for a button press and then set
         the event passed to the constructor.
         Also logs button press and release.
+        Sleeps until the pin interrupt fires, then debounces the change by
+        polling; changes that settle back within the debounce window are ignored.
         """
         self.logger.info(f"Starting button press watcher for button: {self.name}")
 
         while True:
             current_value = self.pin.value()
+            await self.pin_changed.wait()
+
             active = 0
-            while active < 20:
+            settled = 0
+            debounce_ms = self.debounce_ms
+            while active < debounce_ms and settled < debounce_ms:
                 if self.pin.value() != current_value:
                     active += 1
+                    settled = 0
                 else:
                     active = 0
+                    settled += 1
                 await sleep(0.001)
 
+            if active < debounce_ms:
+                # Bounce or glitch, the pin is back where it started
+                continue
+
             if self.pin.value() == 0:
-                self.logger.info(f"Button pressed: {self.name}")
+                if self.logger.info_enabled:
+                    self.logger.info(f"Button pressed: {self.name}")
                 self.button_pressed.set()
-            else:
+            elif self.logger.info_enabled:
                 self.logger.info(f"Button released: {self.name}")
 
     def get_name(self) -> str:
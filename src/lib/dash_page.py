@@ -16,16 +16,27 @@ class DashPage:
         self.name = name
         self.description = description
         self.physical_layout = physical_layout
+        self._set_led_state = physical_layout.set_led_state  # Bound once for the event path
         self.logger = uLogger(f"DashPage:{name}")
         
-        # Entity to component mappings
-        self._entity_to_led = {}     # {entity_id: component_id}
+        # Entity to LED mappings, stored as parallel lists indexed via _entity_index
+        self._entity_index = {}        # {entity_id: index}
+        self._led_entity_ids = []      # [entity_id]
+        self._led_component_ids = []   # [component_id]
+        
+        # Virtual state for LED entities (independent of physical state)
+        self._led_states = []          # [bool]
         
         # Button configurations
-        self._button_actions = {}  # {component_id: {"ha_button": HAButton, "action": {...}}}
+        self._buttons = {}         # {component_id: HAButton}
+        self._button_actions = {}  # {component_id: action_config}
+        
+        # All entities referenced by LEDs or buttons, maintained on registration
+        self._registered_entities = set()
+        self._registered_entities_list = None  # Cached list form, rebuilt on demand
         
-        # Virtual state for entities (independent of physical state)
-        self._entity_states = {}  # {entity_id: state_value}
+        # EventHandler this page is registered with, set by register_page
+        self.event_handler = None
         
         self.logger.info(f"Page '{name}' initialized: {description}")
     
@@ -42,7 +53,16 @@ class DashPage:
             self.logger.error(f"LED component '{component_id}' not found in physical layout")
             return
         
-        self._entity_to_led[entity_id] = component_id
+        index = self._entity_index.get(entity_id)
+        if index is None:
+            self._entity_index[entity_id] = len(self._led_entity_ids)
+            self._led_entity_ids.append(entity_id)
+            self._led_component_ids.append(component_id)
+            self._led_states.append(False)
+        else:
+            self._led_component_ids[index] = component_id
+        self._registered_entities.add(entity_id)
+        self._registered_entities_list = None
         self.logger.info(f"Mapped entity '{entity_id}' to LED '{component_id}'")
     
     def register_button(self, ha_button, action_config: dict) -> None:
@@ -66,10 +86,19 @@ class DashPage:
             return
         
         # Store both the HAButton reference and the action config
-        self._button_actions[ha_button.component_id] = {
-            "ha_button": ha_button,
-            "action": action_config
-        }
+        replaced = ha_button.component_id in self._button_actions
+        self._buttons[ha_button.component_id] = ha_button
+        self._button_actions[ha_button.component_id] = action_config
+        if self.event_handler is not None:
+            # Invalidate the button action caches built from the old mappings
+            self.event_handler.pages_version += 1
+        
+        if replaced:
+            # The previous action's entity may no longer be referenced
+            self._rebuild_registered_entities()
+        elif action_config.get("entity_id"):
+            self._registered_entities.add(action_config["entity_id"])
+            self._registered_entities_list = None
         
         if action_type == "toggle_entity":
             entity_id = action_config.get("entity_id")
@@ -79,6 +108,16 @@ class DashPage:
         else:
             self.logger.warn(f"Unknown action type '{action_type}' for button '{ha_button.component_id}'")
     
+    def _rebuild_registered_entities(self) -> None:
+        """Recalculate the registered entity set from the LED and button mappings."""
+        entities = set(self._led_entity_ids)
+        for action_config in self._button_actions.values():
+            entity_id = action_config.get("entity_id")
+            if entity_id:
+                entities.add(entity_id)
+        self._registered_entities = entities
+        self._registered_entities_list = None
+    
     def update_led_state(self, entity_id: str, state: str, update_physical: bool = True) -> bool:
         """
         Update the LED state based on entity state.
@@ -91,23 +130,35 @@ class DashPage:
         Returns:
             True if the state was changed, False if entity not registered or no change
         """
-        component_id = self._entity_to_led.get(entity_id)
-        if component_id is None:
-            return False
+        return self.update_led_state_bool(entity_id, str(state).lower() == "on", update_physical)
+    
+    def update_led_state_bool(self, entity_id: str, new_state: bool, update_physical: bool = True) -> bool:
+        """
+        Update the LED state from an already evaluated on/off value.
         
-        # Store virtual state
-        new_state = (str(state).lower() == "on")
-        old_state = self._entity_states.get(entity_id)
+        Args:
+            entity_id: The Home Assistant entity ID
+            new_state: True for on, False for off
+            update_physical: If True, update physical GPIO pin; if False, only update virtual state
+            
+        Returns:
+            True if the state was changed, False if entity not registered or no change
+        """
+        index = self._entity_index.get(entity_id)
+        if index is None:
+            return False
         
-        if old_state != new_state:
-            self._entity_states[entity_id] = new_state
+        if self._led_states[index] != new_state:
+            self._led_states[index] = new_state
+            component_id = self._led_component_ids[index]
             
             if update_physical:
                 # Update physical LED through the layout manager
-                self.physical_layout.set_led_state(component_id, new_state)
-                self.logger.info(f"Updated LED '{component_id}' for {entity_id}: {state} (physical)")
-            else:
-                self.logger.info(f"Updated virtual state for {entity_id}: {state} (virtual only)")
+                self._set_led_state(component_id, new_state)
+                if self.logger.info_enabled:
+                    self.logger.info(f"Updated LED '{component_id}' for {entity_id}: {'on' if new_state else 'off'} (physical)")
+            elif self.logger.info_enabled:
+                self.logger.info(f"Updated virtual state for {entity_id}: {'on' if new_state else 'off'} (virtual only)")
             
             return True
         
@@ -118,13 +169,11 @@ class DashPage:
         Sync all physical LEDs to match their virtual state.
         Called when switching to this page to ensure physical matches virtual.
         """
-        synced_count = 0
-        for entity_id, component_id in self._entity_to_led.items():
-            virtual_state = self._entity_states.get(entity_id, False)
-            self.physical_layout.set_led_state(component_id, virtual_state)
-            synced_count += 1
+        synced_count = len(self._led_component_ids)
+        self.physical_layout.set_led_states(self._led_component_ids, self._led_states)
         
-        self.logger.info(f"Synced {synced_count} physical LEDs to virtual state")
+        if self.logger.info_enabled:
+            self.logger.info(f"Synced {synced_count} physical LEDs to virtual state")
     
     def is_entity_registered(self, entity_id: str) -> bool:
         """
@@ -136,17 +185,7 @@ class DashPage:
         Returns:
             True if the entity is registered for either LED or button
         """
-        # Check LEDs
-        if entity_id in self._entity_to_led:
-            return True
-        
-        # Check button actions
-        for button_config in self._button_actions.values():
-            action = button_config.get("action", {})
-            if action.get("entity_id") == entity_id:
-                return True
-        
-        return False
+        return entity_id in self._registered_entities
     
     def get_registered_entities(self) -> list:
         """
@@ -155,17 +194,18 @@ class DashPage:
         Returns:
             List of entity IDs registered on this page
         """
-        entities = set()
-        entities.update(self._entity_to_led.keys())
-        
-        # Add entities from button actions on this page
-        for button_config in self._button_actions.values():
-            action = button_config.get("action", {})
-            entity_id = action.get("entity_id")
-            if entity_id:
-                entities.add(entity_id)
+        if self._registered_entities_list is None:
+            self._registered_entities_list = list(self._registered_entities)
+        return self._registered_entities_list
+    
+    def get_led_entities(self) -> list:
+        """
+        Get the entities mapped to LEDs on this page.
         
-        return list(entities)
+        Returns:
+            List of entity IDs that drive an LED on this page
+        """
+        return self._led_entity_ids
     
     def get_action_for_button(self, component_id: str) -> dict | None:
         """
@@ -177,47 +217,57 @@ class DashPage:
         Returns:
             Action configuration dict or None if button not on this page
         """
-        button_config = self._button_actions.get(component_id)
-        if button_config:
-            return button_config.get("action")
-        return None
+        return self._button_actions.get(component_id)
     
     async def resync(self, ha_api, update_physical: bool = True) -> None:
         """
         Resynchronize all entities on this page with current Home Assistant states.
-        Fetches the current state of each registered entity and updates the LED states.
+        Fetches the current state of all registered entities in one request and updates the LED states.
         
         Args:
             ha_api: HomeAssistantAPI instance for fetching states
             update_physical: If True, update physical LEDs; if False, only update virtual state
         """
-        mode = "physical+virtual" if update_physical else "virtual only"
-        self.logger.info(f"Resyncing page '{self.name}' with Home Assistant ({mode})")
-        synced_count = 0
-        failed_count = 0
+        if self.logger.info_enabled:
+            mode = "physical+virtual" if update_physical else "virtual only"
+            self.logger.info(f"Resyncing page '{self.name}' with Home Assistant ({mode})")
         
-        # Get all registered LED entities
-        for entity_id in self._entity_to_led.keys():
+        # Fetch current states of all registered LED entities in one request
+        entity_states = {}
+        if self._led_entity_ids:
             try:
-                # Fetch current state from Home Assistant
-                state_data = await ha_api.get_state(entity_id)
-                
-                if state_data and isinstance(state_data, dict):
-                    state_value = state_data.get("state")
-                    
-                    if state_value is not None:
-                        # Update virtual state (and optionally physical)
-                        self.update_led_state(entity_id, state_value, update_physical=update_physical)
-                        synced_count += 1
-                    else:
-                        self.logger.warn(f"No state value in response for {entity_id}")
-                        failed_count += 1
-                else:
-                    self.logger.warn(f"Invalid state data for {entity_id}")
-                    failed_count += 1
-                    
+                entity_states = await ha_api.get_states(self._led_entity_ids)
             except Exception as e:
-                self.logger.error(f"Failed to fetch state for {entity_id}: {e}")
+                self.logger.error(f"Failed to fetch states for page '{self.name}': {e}")
+        
+        self.apply_states(entity_states, update_physical=update_physical)
+    
+    def apply_states(self, entity_states: dict, update_physical: bool = True) -> None:
+        """
+        Update all LED entities on this page from already fetched Home Assistant states.
+        
+        Args:
+            entity_states: Dictionary mapping entity IDs to state values, may contain other entities
+            update_physical: If True, update physical LEDs; if False, only update virtual state
+        """
+        if not isinstance(entity_states, dict):
+            self.logger.warn(f"Invalid state data for page '{self.name}'")
+            entity_states = {}
+        
+        synced_count = 0
+        failed_count = 0
+        
+        for entity_id in self._led_entity_ids:
+            state_value = entity_states.get(entity_id)
+            
+            if state_value is not None:
+                # Update virtual state (and optionally physical)
+                self.update_led_state(entity_id, state_value, update_physical=update_physical)
+                synced_count += 1
+            else:
+                if self.logger.warn_enabled:
+                    self.logger.warn(f"No state value in response for {entity_id}")
                 failed_count += 1
         
-        self.logger.info(f"Resync complete: {synced_count} updated, {failed_count} failed")
+        if self.logger.info_enabled:
+            self.logger.info(f"Resync complete: {synced_count} updated, {failed_count} failed")
@@ -17,6 +17,7 @@ class DashboardConfig:
         self.config_file = config_file
         self.logger = uLogger("DashboardConfig")
         self.config = None
+        self._string_pool = {}  # Shared instances of repeated ID strings
         self.logger.info(f"DashboardConfig initialized with file: {config_file}")
     
     def load(self) -> dict:
@@ -30,8 +31,10 @@ class DashboardConfig:
             Exception if file cannot be read or parsed
         """
         try:
-            with open(self.config_file, 'r') as f:
-                self.config = json.load(f)
+            # Read the whole file in one call, json.load() would read it in small chunks
+            with open(self.config_file, 'rb') as f:
+                raw = f.read()
+            self.config = json.loads(raw)
             self.logger.info(f"Loaded configuration from {self.config_file}")
             return self.config
         except OSError as e:
@@ -59,13 +62,30 @@ class DashboardConfig:
             raise ValueError("No configuration loaded")
         
         try:
+            # Serialize up front so the file is written in a single call
+            data = json.dumps(self.config)
             with open(self.config_file, 'w') as f:
-                json.dump(self.config, f)
+                f.write(data)
             self.logger.info(f"Saved configuration to {self.config_file}")
         except OSError as e:
             self.logger.error(f"Failed to write config file: {e}")
             raise
     
+    def _shared(self, value):
+        """
+        Return a single shared instance of an ID string, so IDs repeated across
+        the layout and pages are held in memory once.
+        
+        Args:
+            value: The string to share, or None
+            
+        Returns:
+            The pooled string, or value unchanged if it is not a string
+        """
+        if not isinstance(value, str):
+            return value
+        return self._string_pool.setdefault(value, value)
+    
     def create_physical_layout(self) -> PhysicalLayout:
         """
         Create PhysicalLayout instance from the loaded configuration.
@@ -84,7 +104,7 @@ class DashboardConfig:
         
         # Register LEDs
         for led_config in physical_config.get("leds", []):
-            component_id = led_config.get("id")
+            component_id = self._shared(led_config.get("id"))
             name = led_config.get("name", component_id)
             pin = led_config.get("pin")
             
@@ -99,7 +119,7 @@ class DashboardConfig:
         
         # Register buttons
         for button_config in physical_config.get("buttons", []):
-            component_id = button_config.get("id")
+            component_id = self._shared(button_config.get("id"))
             name = button_config.get("name", component_id)
             pin = button_config.get("pin")
             
@@ -134,6 +154,9 @@ class DashboardConfig:
         
         pages = []
         page_configs = self.config.get("pages", [])
+        # Bind lookups used for every mapping once, outside the loops
+        get_component = physical_layout.get_component
+        get_ha_button = ha_buttons.get
         
         for page_config in page_configs:
             name = page_config.get("name")
@@ -147,21 +170,22 @@ class DashboardConfig:
             page = DashPage(name, description, physical_layout)
             
             # Register component mappings
-            for mapping in page_config.get("mappings", []):
-                component_id = mapping.get("component_id")
+            mappings = page_config.get("mappings", [])
+            for mapping in mappings:
+                component_id = self._shared(mapping.get("component_id"))
                 
                 if not component_id:
                     self.logger.warn(f"Mapping missing component_id on page '{name}': {mapping}")
                     continue
                 
                 # Determine if this is an LED or button mapping
-                component = physical_layout.get_component(component_id)
+                component = get_component(component_id)
                 if component is None:
                     self.logger.warn(f"Component '{component_id}' not found in physical layout")
                     continue
                 
                 if component.type == "led":
-                    entity_id = mapping.get("entity_id")
+                    entity_id = self._shared(mapping.get("entity_id"))
                     if not entity_id:
                         self.logger.warn(f"LED mapping missing entity_id on page '{name}': {mapping}")
                         continue
@@ -169,7 +193,7 @@ class DashboardConfig:
                     
                 elif component.type == "button":
                     # Get the HAButton instance for this component
-                    ha_button = ha_buttons.get(component_id)
+                    ha_button = get_ha_button(component_id)
                     if not ha_button:
                         self.logger.warn(f"HAButton '{component_id}' not found for page '{name}'")
                         continue
@@ -180,7 +204,7 @@ class DashboardConfig:
                     action_config = {"action": action}
                     
                     if action == "toggle_entity":
-                        entity_id = mapping.get("entity_id")
+                        entity_id = self._shared(mapping.get("entity_id"))
                         if not entity_id:
                             self.logger.warn(f"Button toggle_entity action missing entity_id on page '{name}': {mapping}")
                             continue
@@ -199,7 +223,7 @@ class DashboardConfig:
                     self.logger.warn(f"Unknown component type '{component.type}' for '{component_id}'")
             
             pages.append(page)
-            self.logger.info(f"Created page '{name}' with {len(page_config.get('mappings', []))} mappings")
+            self.logger.info(f"Created page '{name}' with {len(mappings)} mappings")
         
         return pages
     
@@ -253,17 +277,20 @@ class DashboardConfig:
             raise ValueError("Configuration not loaded. Call load() first.")
         
         pages = self.config.get("pages", [])
-        original_count = len(pages)
         
-        pages = [p for p in pages if p.get("name") != page_name]
-        self.config["pages"] = pages
+        # Remove every page with the name in place rather than rebuilding the list,
+        # walking backwards so deleting doesn't shift pages still to be checked
+        removed = False
+        for i in range(len(pages) - 1, -1, -1):
+            if pages[i].get("name") == page_name:
+                del pages[i]
+                removed = True
         
-        if len(pages) < original_count:
+        if removed:
             self.logger.info(f"Removed page configuration: {page_name}")
-            return True
         else:
             self.logger.warn(f"Page not found: {page_name}")
-            return False
+        return removed
     
     def set_default_page(self, page_name: str) -> None:
         """
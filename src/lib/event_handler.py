@@ -15,17 +15,42 @@ class EventHandler:
         self.logger = uLogger("EventHandler")
         self.ha_api = ha_api
         self.pages = {}  # {page_name: DashPage}
+        self._entity_pages = {}  # {entity_id: [DashPage]} for pages with an LED tracking the entity
+        self.pages_version = 0  # Bumped whenever the registered pages change
+        self._page_order = []  # Page names in registration order
+        self._page_index = {}  # {page_name: position in _page_order}
         self.current_page = None
         self.logger.info("EventHandler initialized")
     
     def register_page(self, page: DashPage) -> None:
         """
-        Register a dashboard page.
+        Register a dashboard page. The page's LED mappings must be complete
+        before registering, as they are indexed here for event dispatch.
         
         Args:
             page: DashPage instance to register
         """
+        old_page = self.pages.get(page.name)
+        if old_page is not None:
+            old_page.event_handler = None
+            for entity_id in old_page.get_led_entities():
+                pages = self._entity_pages[entity_id]
+                pages.remove(old_page)
+                if not pages:
+                    del self._entity_pages[entity_id]
+        else:
+            self._page_index[page.name] = len(self._page_order)
+            self._page_order.append(page.name)
+        
         self.pages[page.name] = page
+        page.event_handler = self
+        self.pages_version += 1
+        for entity_id in page.get_led_entities():
+            pages = self._entity_pages.get(entity_id)
+            if pages is None:
+                self._entity_pages[entity_id] = [page]
+            else:
+                pages.append(page)
         self.logger.info(f"Registered page: {page.name}")
         
         # Set as current page if it's the first one
@@ -44,7 +69,8 @@ class EventHandler:
         """
         if page_name in self.pages:
             self.current_page = page_name
-            self.logger.info(f"Switched to page: {page_name}")
+            if self.logger.info_enabled:
+                self.logger.info(f"Switched to page: {page_name}")
             
             # Sync physical LEDs to match virtual state (no API calls needed!)
             new_page = self.pages[page_name]
@@ -55,6 +81,41 @@ class EventHandler:
             self.logger.error(f"Page '{page_name}' not found")
             return False
     
+    def is_entity_tracked(self, entity_id: str) -> bool:
+        """
+        Check if any registered page has an LED tracking an entity.
+        
+        Args:
+            entity_id: The Home Assistant entity ID
+            
+        Returns:
+            True if at least one page would act on a state change for the entity
+        """
+        return entity_id in self._entity_pages
+    
+    def get_tracked_entities(self) -> list:
+        """
+        Get every entity that has an LED tracking it on at least one page.
+        
+        Returns:
+            List of entity IDs
+        """
+        return list(self._entity_pages.keys())
+    
+    def get_next_page_name(self) -> str | None:
+        """
+        Get the name of the page after the current one, wrapping around to the first.
+        
+        Returns:
+            The next page name, the first page if there is no current page,
+            or None if no pages are registered
+        """
+        page_order = self._page_order
+        if not page_order:
+            return None
+        index = self._page_index.get(self.current_page, -1)
+        return page_order[(index + 1) % len(page_order)]
+    
     def get_current_page(self) -> DashPage | None:
         """
         Get the currently active page.
@@ -97,22 +158,38 @@ class EventHandler:
         if state_value is None:
             return
         
-        # Update virtual state on ALL pages that have this entity registered
+        self.handle_state_change(entity_id, state_value)
+    
+    def handle_state_change(self, entity_id: str, state_value) -> None:
+        """
+        Update dashboard pages for an entity's new state, for callers that have
+        already extracted it from the event message.
+        
+        Args:
+            entity_id: The Home Assistant entity ID
+            state_value: The entity's new state value
+        """
+        # Update virtual state on ALL pages that have an LED tracking this entity
         # This ensures page switches don't require API resync calls
+        pages = self._entity_pages.get(entity_id)
+        if not pages:
+            return
+        
         current_page = self.get_current_page()
         pages_updated = []
+        # Evaluate the state once rather than on every page
+        is_on = state_value == "on" or str(state_value).lower() == "on"
         
-        for page_name, page in self.pages.items():
-            if page.is_entity_registered(entity_id):
-                # Update virtual state on all pages, but only update physical GPIO on current page
-                is_current = (page == current_page)
-                updated = page.update_led_state(entity_id, state_value, update_physical=is_current)
-                
-                if updated:
-                    pages_updated.append(page_name)
+        for page in pages:
+            # Update virtual state on all pages, but only update physical GPIO on current page
+            is_current = (page is current_page)
+            updated = page.update_led_state_bool(entity_id, is_on, update_physical=is_current)
+            
+            if updated:
+                pages_updated.append(page.name)
         
         # Log summary of updates
-        if pages_updated:
+        if pages_updated and self.logger.info_enabled:
             self.logger.info(f"Updated {entity_id}: {state_value} on pages: {', '.join(pages_updated)}")
     
     async def resync_current_page(self) -> None:
@@ -129,15 +206,25 @@ class EventHandler:
         Resynchronize all pages with current Home Assistant states.
         This should be called on startup to ensure all pages have initial states.
         
-        Updates virtual state on all pages, then syncs physical LEDs to the current page.
+        Fetches the states of every page's entities in one request, updates virtual
+        state on all pages, then syncs physical LEDs to the current page.
         This prevents pages with shared physical LEDs from overwriting each other.
         """
         self.logger.info(f"Resyncing all {len(self.pages)} pages with Home Assistant")
         
+        # Fetch every LED entity across all pages in a single request
+        entity_states = {}
+        entity_ids = list(self._entity_pages.keys())
+        if entity_ids:
+            try:
+                entity_states = await self.ha_api.get_states(entity_ids)
+            except Exception as e:
+                self.logger.error(f"Failed to fetch states for resync: {e}")
+        
         # Update virtual state on all pages (don't touch physical LEDs yet)
         for page_name, page in self.pages.items():
             try:
-                await page.resync(self.ha_api, update_physical=False)
+                page.apply_states(entity_states, update_physical=False)
             except Exception as e:
                 self.logger.error(f"Failed to resync page '{page_name}': {e}")
         
@@ -3,8 +3,22 @@ import lib.uaiohttpclient as httpclient
 from lib.networking import WirelessNetwork
 from config import HA_HOST, HA_PORT, HA_TOKEN
 from json import loads, dumps
+from utime import ticks_ms, ticks_diff
 import gc
 
+# Remembers the confirmed HTTP/HTTPS base URL across reboots
+PROTOCOL_CACHE_FILE = "ha_protocol.txt"
+
+# Skip the network access check if a request succeeded within this window
+NETWORK_CHECK_INTERVAL_MS = 5000
+
+
+class HAAPIError(ValueError):
+    """Home Assistant replied with an error status, kept in status."""
+    def __init__(self, message: str, status) -> None:
+        super().__init__(message)
+        self.status = status
+
 
 class HomeAssistantAPI:
     """
@@ -21,7 +35,38 @@ class HomeAssistantAPI:
         self.https_base_url = f"https://{HA_HOST}:{HA_PORT}/api/"
         self.base_url = self.http_base_url  # Try HTTP first (faster)
         self.token = HA_TOKEN
+        # Headers shared by every request, copied per request to add Content-Length
+        self._headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
         self.protocol_confirmed = False  # Track if we've confirmed which protocol works
+        # Keep-alive session so requests reuse the connection, avoiding a TCP/TLS handshake each time
+        self._session = httpclient.ClientSession()
+        self._last_success_ms = None  # ticks_ms of the last successful request
+        # Cleared if the token may not render templates, which needs an admin user
+        self._template_allowed = True
+        self._load_protocol_cache()
+    
+    def _load_protocol_cache(self) -> None:
+        """Use the base URL confirmed on a previous boot, if it matches the current config."""
+        try:
+            with open(PROTOCOL_CACHE_FILE, "r") as f:
+                cached_url = f.read().strip()
+        except OSError:
+            return
+        if cached_url in (self.http_base_url, self.https_base_url):
+            self.base_url = cached_url
+            self.protocol_confirmed = True
+            self.log.info(f"Using cached protocol: {self.base_url}")
+    
+    def _save_protocol_cache(self) -> None:
+        """Persist the confirmed base URL so the next boot can skip protocol probing."""
+        try:
+            with open(PROTOCOL_CACHE_FILE, "w") as f:
+                f.write(self.base_url)
+        except OSError as e:
+            self.log.warn(f"Failed to save protocol cache: {e}")
     
     async def get_state(self, entity_id: str) -> dict:
         """
@@ -36,7 +81,71 @@ class HomeAssistantAPI:
         url = f"{self.base_url}states/{entity_id}"
         return await self._make_request("GET", url)
     
-    async def set_state(self, entity_id: str, state: str, attributes: dict | None = None) -> dict:
+    async def get_states(self, entity_ids: list) -> dict:
+        """
+        Get the current state values of several entities in a single request.
+        Renders a template server side so that only the requested states are
+        returned, rather than fetching every entity from /api/states.
+        
+        Rendering templates needs an admin user's token. If the token is
+        refused, states are fetched one entity at a time instead, and that is
+        remembered for later calls.
+        
+        Args:
+            entity_ids: List of entity IDs (e.g., ['light.living_room', 'switch.fan'])
+        
+        Returns:
+            dict mapping entity ID to state value (None if the entity does not exist)
+        """
+        if not entity_ids:
+            return {}
+        if self._template_allowed:
+            fields = []
+            for entity_id in entity_ids:
+                domain, _, object_id = entity_id.partition(".")
+                # Missing entities render as null rather than states()'s 'unknown'
+                fields.append(
+                    f'"{entity_id}":{{% set s = states["{domain}"]["{object_id}"] %}}'
+                    f'{{{{ s.state | tojson if s is not none else "null" }}}}'
+                )
+            url = f"{self.base_url}template"
+            json_data = dumps({"template": "{" + ",".join(fields) + "}"}).encode()
+            try:
+                return await self._make_request("POST", url, json_data)
+            except HAAPIError as e:
+                if e.status not in (401, 403):
+                    raise
+                self.log.warn("Token cannot render templates (admin only), fetching states one at a time")
+                self._template_allowed = False
+        return await self._get_states_individually(entity_ids)
+    
+    async def _get_states_individually(self, entity_ids: list) -> dict:
+        """
+        Get the current state values of several entities with one request each,
+        which unlike the template endpoint works for non-admin users.
+        
+        Args:
+            entity_ids: List of entity IDs
+        
+        Returns:
+            dict mapping entity ID to state value (None if the entity does not exist)
+        """
+        states = {}
+        for entity_id in entity_ids:
+            try:
+                state_data = await self.get_state(entity_id)
+            except Exception as e:
+                # Carry on with the other entities rather than losing the whole resync
+                if isinstance(e, HAAPIError) and e.status == 404:
+                    self.log.warn(f"Entity not found: {entity_id}")
+                else:
+                    self.log.error(f"Failed to fetch state for {entity_id}: {e}")
+                state_data = None
+            states[entity_id] = state_data.get("state") if isinstance(state_data, dict) else None
+        return states
+    
+    async def set_state(self, entity_id: str, state: str, attributes: dict | None = None,
+                        parse_response: bool = True) -> dict:
         """
         Set the state of a Home Assistant entity.
         Note: This updates the state in HA's state machine but doesn't trigger device actions.
@@ -46,15 +155,17 @@ class HomeAssistantAPI:
             entity_id: The entity ID
             state: The new state value (e.g., 'on', 'off')
             attributes: Optional dict of attributes
+            parse_response: Set False to skip decoding the reply when it is not needed
         
         Returns:
-            dict containing the updated state
+            dict containing the updated state, empty if parse_response is False
         """
         url = f"{self.base_url}states/{entity_id}"
-        json_data = dumps({"state": state, "attributes": attributes or {}})
-        return await self._make_request("POST", url, json_data)
+        json_data = dumps({"state": state, "attributes": attributes or {}}).encode()
+        return await self._make_request("POST", url, json_data, parse_response)
     
-    async def call_service(self, domain: str, service: str, entity_id: str | None = None, **kwargs) -> dict:
+    async def call_service(self, domain: str, service: str, entity_id: str | None = None,
+                           parse_response: bool = True, **kwargs) -> dict:
         """
         Call a Home Assistant service.
         
@@ -62,56 +173,65 @@ class HomeAssistantAPI:
             domain: Service domain (e.g., 'light', 'switch', 'homeassistant')
             service: Service name (e.g., 'turn_on', 'turn_off', 'toggle')
             entity_id: Optional entity ID to target
+            parse_response: Set False to skip decoding the reply when it is not needed
             **kwargs: Additional service data
         
         Returns:
-            dict containing the service call result
+            dict containing the service call result, empty if parse_response is False
         """
         url = f"{self.base_url}services/{domain}/{service}"
-        service_data = kwargs.copy()
-        if entity_id:
-            service_data["entity_id"] = entity_id
-        json_data = dumps(service_data)
-        return await self._make_request("POST", url, json_data)
+        if entity_id and not kwargs and '"' not in entity_id and '\\' not in entity_id:
+            # Common single-entity call, build the JSON directly rather than via a dict
+            json_data = ('{"entity_id":"' + entity_id + '"}').encode()
+        else:
+            service_data = kwargs.copy()
+            if entity_id:
+                service_data["entity_id"] = entity_id
+            json_data = dumps(service_data).encode()
+        return await self._make_request("POST", url, json_data, parse_response)
     
-    async def toggle_light(self, entity_id: str) -> dict:
+    async def toggle_light(self, entity_id: str, parse_response: bool = True) -> dict:
         """
         Toggle a light entity.
         
         Args:
             entity_id: The light entity ID (e.g., 'light.living_room')
+            parse_response: Set False to skip decoding the reply when it is not needed
         
         Returns:
-            dict containing the service call result
+            dict containing the service call result, empty if parse_response is False
         """
-        return await self.call_service("light", "toggle", entity_id)
+        return await self.call_service("light", "toggle", entity_id, parse_response)
     
-    async def turn_on_light(self, entity_id: str, **kwargs) -> dict:
+    async def turn_on_light(self, entity_id: str, parse_response: bool = True, **kwargs) -> dict:
         """
         Turn on a light entity.
         
         Args:
             entity_id: The light entity ID
+            parse_response: Set False to skip decoding the reply when it is not needed
             **kwargs: Optional parameters (brightness, color, etc.)
         
         Returns:
-            dict containing the service call result
+            dict containing the service call result, empty if parse_response is False
         """
-        return await self.call_service("light", "turn_on", entity_id, **kwargs)
+        return await self.call_service("light", "turn_on", entity_id, parse_response, **kwargs)
     
-    async def turn_off_light(self, entity_id: str) -> dict:
+    async def turn_off_light(self, entity_id: str, parse_response: bool = True) -> dict:
         """
         Turn off a light entity.
         
         Args:
             entity_id: The light entity ID
+            parse_response: Set False to skip decoding the reply when it is not needed
         
         Returns:
-            dict containing the service call result
+            dict containing the service call result, empty if parse_response is False
         """
-        return await self.call_service("light", "turn_off", entity_id)
+        return await self.call_service("light", "turn_off", entity_id, parse_response)
     
-    async def _make_request(self, method: str, url: str, json_data: str = "") -> dict:
+    async def _make_request(self, method: str, url: str, json_data: bytes = b"",
+                            parse_response: bool = True) -> dict:
         """
         Internal method for making an API request to Home Assistant.
         Tries HTTP first for speed, falls back to HTTPS if needed.
@@ -119,17 +239,17 @@ class HomeAssistantAPI:
         Args:
             method: HTTP method (GET, POST, etc.)
             url: Full URL to request
-            json_data: Optional JSON data string for POST requests
+            json_data: Optional UTF-8 encoded JSON body for POST requests
+            parse_response: If False the response body is read but not decoded
         
         Returns:
-            dict containing the response data
+            dict containing the response data, empty if parse_response is False
         
         Raises:
-            ValueError: If the HTTP status code indicates an error
+            HAAPIError: If Home Assistant replied with an error status
         """
-        gc.collect()
-        
-        self.log.info(f"Calling HA API: {url}, method: {method}")
+        if self.log.info_enabled:
+            self.log.info(f"Calling HA API: {url}, method: {method}")
         
         # If protocol not yet confirmed, try HTTP first, then HTTPS
         urls_to_try = [url] if self.protocol_confirmed else [
@@ -140,43 +260,54 @@ class HomeAssistantAPI:
         last_error = None
         for attempt_url in urls_to_try:
             try:
-                await self.wifi.check_network_access()
+                if self._last_success_ms is None or \
+                        ticks_diff(ticks_ms(), self._last_success_ms) > NETWORK_CHECK_INTERVAL_MS:
+                    await self.wifi.check_network_access()
                 
-                headers = {
-                    "Authorization": f"Bearer {self.token}",
-                    "Content-Type": "application/json",
-                    "Content-Length": str(len(json_data))
-                }
+                headers = self._headers.copy()
+                headers["Content-Length"] = str(len(json_data))
                 
-                request = await httpclient.request(method, attempt_url, headers=headers, json_data=json_data)
+                request = await self._session.request(method, attempt_url, headers=headers, json_data=json_data)
                 status = getattr(request, "status", None)
-                self.log.info(f"Request status: {status}")
+                if self.log.info_enabled:
+                    self.log.info(f"Request status: {status}")
                 
                 response = await request.read()
-                self.log.info(f"Response data: {response}")
-                
-                data = {}
-                if response:
-                    data = loads(response)
-                    self.log.info(f"Parsed JSON: {data}")
-                
-                if status is not None and 200 <= status < 300:
-                    # Success! Confirm this protocol for future requests
-                    if not self.protocol_confirmed:
-                        self.base_url = attempt_url.split('/api/')[0] + '/api/'
-                        self.protocol_confirmed = True
-                        self.log.info(f"Protocol confirmed: {self.base_url}")
-                    self.log.info("HA API request successful")
-                    return data
-                else:
-                    raise ValueError(f"HA API error: Status {status}, Response: {response}")
-                    
+                if self.log.info_enabled:
+                    self.log.info(f"Response data: {response}")
             except Exception as e:
                 self.log.warn(f"Failed to call HA API: {attempt_url}. Exception: {e}")
                 last_error = e
                 continue
+            
+            # Any status reply shows this protocol works, so confirm it and stop probing
+            # rather than let the other protocol's transport error hide the reply
+            if status is not None and not self.protocol_confirmed:
+                # Persist even when it matches the default, so the next boot skips probing
+                self.base_url = attempt_url.split('/api/')[0] + '/api/'
+                self.protocol_confirmed = True
+                self._save_protocol_cache()
+                self.log.info(f"Protocol confirmed: {self.base_url}")
+            
+            if status is None or not 200 <= status < 300:
+                error = HAAPIError(f"HA API error: Status {status}, Response: {response}", status)
+                self.log.warn(f"Failed to call HA API: {attempt_url}. Exception: {error}")
+                raise error
+            
+            data = {}
+            if parse_response and response:
+                data = loads(response)
+                if self.log.info_enabled:
+                    self.log.info(f"Parsed JSON: {data}")
+            
+            self._last_success_ms = ticks_ms()
+            self.log.info("HA API request successful")
+            return data
         
         # If we get here, all attempts failed
         self.log.error("Failed to call HA API with all protocol attempts")
+        # Only transport failures get here, so probe both protocols again next time
+        # in case the server changed
+        self.protocol_confirmed = False
         gc.collect()
         raise last_error if last_error else ValueError("Failed to connect to HA API")
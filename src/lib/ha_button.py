@@ -23,6 +23,14 @@ class HAButton:
         self.event_handler = event_handler
         self.ha_api = ha_api
         self.logger = uLogger(f"HAButton:{component_id}")
+        self._action_cache = {}  # {page_name: action_config} for this button
+        self._press_task = None  # Task handling the current press, if any
+        self._action_cache_version = -1  # event_handler.pages_version the cache was built for
+        # Handler for each action type, so a press is dispatched with a single lookup
+        self._action_handlers = {
+            "toggle_entity": self._handle_toggle_entity,
+            "next_dashboard": self._handle_next_dashboard
+        }
         
         # Create event and underlying Button instance
         self.button_event = Event()
@@ -33,16 +41,28 @@ class HAButton:
     def get_button_action(self) -> dict | None:
         """
         Get the action configuration for this button on the current page.
+        Results are cached per page until the registered pages change.
         
         Returns:
             Dictionary with action config or None if not mapped on current page
             Format: {"action": "toggle_entity", "entity_id": "light.living_room"}
                  or {"action": "next_dashboard"}
         """
-        current_page = self.event_handler.get_current_page()
+        event_handler = self.event_handler
+        if self._action_cache_version != event_handler.pages_version:
+            self._action_cache = {}
+            self._action_cache_version = event_handler.pages_version
+        
+        page_name = event_handler.current_page
+        if page_name in self._action_cache:
+            return self._action_cache[page_name]
+        
+        action_config = None
+        current_page = event_handler.get_current_page()
         if current_page:
-            return current_page.get_action_for_button(self.component_id)
-        return None
+            action_config = current_page.get_action_for_button(self.component_id)
+        self._action_cache[page_name] = action_config
+        return action_config
     
     async def handle_press(self) -> None:
         """Handle a button press by executing the configured action."""
@@ -53,13 +73,13 @@ class HAButton:
             return
         
         action_type = action_config.get("action")
+        handler = self._action_handlers.get(action_type)
         
-        if action_type == "toggle_entity":
-            await self._handle_toggle_entity(action_config)
-        elif action_type == "next_dashboard":
-            await self._handle_next_dashboard()
-        else:
+        if handler is None:
             self.logger.error(f"Unknown action type: {action_type}")
+            return
+        
+        await handler(action_config)
     
     async def _handle_toggle_entity(self, action_config: dict) -> None:
         """Handle toggling a Home Assistant entity."""
@@ -69,47 +89,39 @@ class HAButton:
             self.logger.error("toggle_entity action missing entity_id")
             return
         
-        self.logger.info(f"Button '{self.component_id}' pressed, toggling {entity_id}")
+        if self.logger.info_enabled:
+            self.logger.info(f"Button '{self.component_id}' pressed, toggling {entity_id}")
         
         try:
             # Toggle the entity - service calls return array of states after action
-            result = await self.ha_api.toggle_light(entity_id)
-            self.logger.info(f"Entity {entity_id} toggled successfully")
+            # The reply is only used for logging, so skip decoding it when info logs are off
+            result = await self.ha_api.toggle_light(entity_id, parse_response=self.logger.info_enabled)
             
             # Log the new state if available
-            if isinstance(result, list) and len(result) > 0:
-                current_state = result[0].get('state', 'toggled')
-                self.logger.info(f"Entity is now: {current_state}")
-            else:
-                self.logger.info("Entity toggled (state not returned)")
+            if self.logger.info_enabled:
+                self.logger.info(f"Entity {entity_id} toggled successfully")
+                if result and isinstance(result, list) and isinstance(result[0], dict):
+                    self.logger.info(f"Entity is now: {result[0].get('state', 'toggled')}")
+                else:
+                    self.logger.info("Entity toggled (state not returned)")
             
         except Exception as e:
             self.logger.error(f"Failed to toggle entity {entity_id}: {e}")
     
-    async def _handle_next_dashboard(self) -> None:
+    async def _handle_next_dashboard(self, action_config: dict) -> None:
         """Handle switching to the next dashboard page."""
-        self.logger.info(f"Button '{self.component_id}' pressed, switching to next dashboard")
+        if self.logger.info_enabled:
+            self.logger.info(f"Button '{self.component_id}' pressed, switching to next dashboard")
         
-        # Get all registered pages
-        pages = list(self.event_handler.pages.keys())
+        # Get next page (wraps around, or first page if no current page)
+        next_page_name = self.event_handler.get_next_page_name()
         
-        if len(pages) == 0:
+        if next_page_name is None:
             self.logger.warn("No pages available")
             return
         
-        # Find current page index
-        current_page_name = self.event_handler.current_page
-        
-        if current_page_name not in pages:
-            # No current page or invalid, go to first
-            next_page_name = pages[0]
-        else:
-            # Get next page (wrap around to first if at end)
-            current_index = pages.index(current_page_name)
-            next_index = (current_index + 1) % len(pages)
-            next_page_name = pages[next_index]
-        
-        self.logger.info(f"Switching from '{current_page_name}' to '{next_page_name}'")
+        if self.logger.info_enabled:
+            self.logger.info(f"Switching from '{self.event_handler.current_page}' to '{next_page_name}'")
         self.event_handler.set_current_page(next_page_name)
     
     async def monitor(self) -> None:
@@ -117,17 +129,18 @@ class HAButton:
         self.logger.info(f"Starting monitor for button '{self.component_id}'")
         
         while True:
-            # Wait for button event to be set
+            # Wait for button event to be set, then clear it for the next press
             await self.button_event.wait()
-            
-            # Handle the press
-            await self.handle_press()
-            
-            # Clear the event for next press
             self.button_event.clear()
+            
+            # Handle the press in its own task so the loop is not held up by the HA request.
+            # Presses while one is still being handled are dropped.
+            if self._press_task is None or self._press_task.done():
+                self._press_task = create_task(self.handle_press())
+            else:
+                self.logger.warn(f"Button '{self.component_id}' pressed while busy, ignoring")
     
     def start_tasks(self) -> None:
         """Start background tasks for this button."""
         create_task(self.button.wait_for_press())
         create_task(self.monitor())
-        self.logger.info(f"Started tasks for button '{self.component_id}'")
@@ -1,8 +1,8 @@
-from lib.ulogging import uLogger
+from lib.ulogging import uLogger, periodic_flush
 from lib.networking import WirelessNetwork
 from lib.ha_api import HomeAssistantAPI
 from lib.ha_websocket import HomeAssistantWebSocket
-from asyncio import create_task, get_event_loop, sleep
+from asyncio import create_task, get_event_loop, sleep, Event, wait_for, TimeoutError
 from lib.utils import StatusLED
 from lib.event_handler import EventHandler
 from lib.dashboard_config import DashboardConfig
@@ -11,6 +11,7 @@ from utime import ticks_ms, ticks_diff
 from config import WS_WATCHDOG_TIMEOUT_SECONDS
 from http.lib.webserver import WebServer
 from http.lib.ha_dash_api import HADashAPI
+import gc
 
 class HADash:
     """Main application class for the HA hardware dashboard."""
@@ -19,7 +20,7 @@ class HADash:
         self.logger = uLogger("HADash")
         self.logger.info("HADash initialized")
         self.status_led = StatusLED()
-        self._flash_task = None
+        self._flash_event = Event()  # Set to request a status LED flash from _flash_worker
         self.wireless = WirelessNetwork()
         self.ha_api = HomeAssistantAPI(self.wireless)
         self.ha_ws = HomeAssistantWebSocket(self.wireless)
@@ -59,6 +60,9 @@ class HADash:
             for page in pages:
                 self.event_handler.register_page(page)
             
+            # Only parse WebSocket events for entities shown on a page
+            self.ha_ws.set_entity_filter(self.event_handler.get_tracked_entities())
+            
             # Set the default page if specified
             default_page = dash_config.get_default_page()
             if default_page:
@@ -101,6 +105,11 @@ class HADash:
     def startup(self) -> None:
         """Start background tasks and enter the event loop."""
         self.logger.info("HADash is starting up...")
+        # Let the allocator collect automatically after a quarter of the free heap
+        # has been allocated, rather than the API running a full collection on every request
+        gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+        create_task(periodic_flush())
+        create_task(self._flash_worker())
         self.wireless.startup()
         self.configure_buttons()
         asyncio_loop = get_event_loop()
@@ -165,24 +174,23 @@ class HADash:
     async def _websocket_watchdog(self) -> None:
         """Monitor websocket health and restart if no events received."""
         watchdog_timeout_s = WS_WATCHDOG_TIMEOUT_SECONDS
-        check_interval_s = 60  # Check every minute
+        min_check_interval_s = 5  # Floor on the sleep between checks
         
         # Wait for initial connection before starting watchdog
         self.logger.info("Waiting for WebSocket connection before starting watchdog...")
         max_wait = 60  # Maximum 60 seconds to wait for connection
-        waited = 0
-        while not self.ha_ws.is_open() and waited < max_wait:
-            await sleep(2)
-            waited += 2
-        
-        if not self.ha_ws.is_open():
+        try:
+            await wait_for(self.ha_ws.ready.wait(), max_wait)
+        except TimeoutError:
             self.logger.warn(f"WebSocket not open after {max_wait}s, starting watchdog anyway")
 
         self.logger.info(f"WebSocket watchdog started (timeout: {watchdog_timeout_s}s)")
         
         while True:
             try:
-                await sleep(check_interval_s)
+                # Sleep until the timeout would expire if no further events arrive
+                time_since_last_event = ticks_diff(ticks_ms(), self._last_event_ms) / 1000
+                await sleep(max(min_check_interval_s, watchdog_timeout_s - time_since_last_event + 1))
                 
                 time_since_last_event = ticks_diff(ticks_ms(), self._last_event_ms) / 1000
                 
@@ -224,20 +232,13 @@ class HADash:
         """
         # Wait for WebSocket to establish connection and subscription
         max_wait_seconds = 15
-        wait_interval = 0.5
-        elapsed = 0
         
         self.logger.info("Waiting for WebSocket connection before initial sync...")
-        while not self.ha_ws.is_open() and elapsed < max_wait_seconds:
-            await sleep(wait_interval)
-            elapsed += wait_interval
-        
-        if not self.ha_ws.is_open():
-            self.logger.error("WebSocket not connected after waiting, initial sync may fail")
-        else:
-            # Give it a bit more time to complete subscription
-            await sleep(1)
+        try:
+            await wait_for(self.ha_ws.ready.wait(), max_wait_seconds)
             self.logger.info("WebSocket connected, starting initial state sync...")
+        except TimeoutError:
+            self.logger.error("WebSocket not connected after waiting, initial sync may fail")
         
         await self.event_handler.resync_all_pages()
         self.logger.info("Initial state sync complete")
@@ -249,28 +250,44 @@ class HADash:
         
         if message.get("type") != "event":
             return
-        event = message.get("event", {})
+        # HA always sends "event" with event messages, and "data" with state_changed events
+        event = message["event"]
         if event.get("event_type") != "state_changed":
             return
-        data = event.get("data", {})
+        data = event["data"]
         entity_id = data.get("entity_id")
-        new_state = data.get("new_state", {})
+        event_handler = self.event_handler
+        # Most state changes are for entities no page displays, drop them before any work
+        if not event_handler.is_entity_tracked(entity_id):
+            return
+        new_state = data.get("new_state")
         state_value = None
         if isinstance(new_state, dict):
             state_value = new_state.get("state")
 
         if entity_id:
-            if state_value is not None:
-                self.logger.info(f"state_changed: {entity_id} -> {state_value}")
-            else:
-                self.logger.info(f"state_changed: {entity_id}")
+            if self.logger.info_enabled:
+                if state_value is not None:
+                    self.logger.info(f"state_changed: {entity_id} -> {state_value}")
+                else:
+                    self.logger.info(f"state_changed: {entity_id}")
             self.trigger_status_flash()
-            self.event_handler.handle_event(message)
+            if state_value is not None:
+                # Already unpacked above, so skip re-parsing the message in handle_event
+                event_handler.handle_state_change(entity_id, state_value)
 
     def trigger_status_flash(self) -> None:
-        """Trigger a single LED flash without overlapping tasks."""
-        if self._flash_task is None or self._flash_task.done():
-            self._flash_task = create_task(self.status_led.async_flash(1, 10))
+        """Request a single LED flash; requests made during a flash are coalesced."""
+        self._flash_event.set()
+    
+    async def _flash_worker(self) -> None:
+        """Flash the status LED once each time a flash is requested, at most every 200ms."""
+        holdoff_s = 0.1  # Dark gap after each 100ms flash, so bursts don't run together
+        while True:
+            await self._flash_event.wait()
+            self._flash_event.clear()
+            await self.status_led.async_flash(1, 10)
+            await sleep(holdoff_s)
     
     async def _start_web_server(self) -> None:
         """Start the web server for the configuration interface."""
@@ -3,6 +3,7 @@ from lib.networking import WirelessNetwork
 from config import HA_HOST, HA_PORT, HA_TOKEN
 from json import loads, dumps
 from os import urandom
+from random import getrandbits
 from ubinascii import b2a_base64
 from utime import ticks_ms, ticks_diff
 import asyncio
@@ -10,10 +11,39 @@ try:
     import ssl
 except ImportError:
     ssl = None
+try:
+    import socket
+except ImportError:
+    socket = None
 try:
     import gc
 except ImportError:
     gc = None
+try:
+    from lib.ws_mask import mask_in_place
+except (ImportError, SyntaxError):
+    mask_in_place = None
+from struct import pack_into
+from sys import byteorder
+
+# Masked close frame with no payload; the mask key is irrelevant with nothing to mask
+_CLOSE_FRAME = b"\x88\x80\x00\x00\x00\x00"
+_ZERO_MASK_KEY = b"\x00\x00\x00\x00"
+
+# Largest payload sent from the reusable transmit buffer, which covers pings,
+# pongs and service calls; anything bigger gets a buffer of its own
+_TX_SCRATCH_PAYLOAD = 1024
+
+
+def _apply_mask(buf, mask_key: bytes) -> None:
+    """XOR a word aligned bytearray or memoryview in place with a 4 byte WebSocket mask key."""
+    length = len(buf)
+    if mask_in_place is not None:
+        mask_in_place(buf, length, mask_key, int.from_bytes(mask_key, byteorder))
+        return
+    # No viper, so XOR the whole payload as one big integer rather than byte by byte
+    key = (mask_key * ((length >> 2) + 1))[:length]
+    buf[:] = (int.from_bytes(buf, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
 
 
 class HomeAssistantWebSocket:
@@ -35,7 +65,6 @@ class HomeAssistantWebSocket:
         pong_timeout_s: int = 10,
         read_timeout_s: int = 10,
         listen_timeout_s: int = 30,
-        poll_interval_s: float = 0.05,
         reconnect_initial_delay_s: int = 1,
         reconnect_max_delay_s: int = 30
     ) -> None:
@@ -48,19 +77,40 @@ class HomeAssistantWebSocket:
         except Exception as e:
             raise ValueError(f"Invalid HA_PORT: {HA_PORT}") from e
         self.token = HA_TOKEN
+        # Upgrade request up to the per-connection key, built once for all reconnects
+        self._handshake_prefix = (
+            "GET /api/websocket HTTP/1.1\r\n"
+            "Host: {}:{}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            "Sec-WebSocket-Key: "
+        ).format(self.host, self.port).encode("latin-1")
         self.reader = None
         self.writer = None
         self.connected = False
         self.use_ssl = False
+        self._ssl_context = None
         self._message_id = 1
         self.ping_interval_s = ping_interval_s
         self.pong_timeout_s = pong_timeout_s
         self.read_timeout_s = read_timeout_s
         self.listen_timeout_s = listen_timeout_s
-        self.poll_interval_s = poll_interval_s
         self.reconnect_initial_delay_s = reconnect_initial_delay_s
         self.reconnect_max_delay_s = reconnect_max_delay_s
-        self._last_pong_ms = ticks_ms()
+        # Reused for small outgoing frames; 8 bytes covers the header up to 16 bit lengths
+        # plus the padding that word aligns the payload
+        self._tx_buf = bytearray(8 + _TX_SCRATCH_PAYLOAD)
+        self._tx_view = memoryview(self._tx_buf)
+        # Reused for incoming frame headers, large enough for a 64 bit length
+        self._rx_header = memoryview(bytearray(8))
+        # Serialises frame writes, as pong replies are sent from their own task
+        self._write_lock = asyncio.Lock()
+        self._pong_received = asyncio.Event()  # Set when a pong arrives for the keepalive
+        # Set once connected, authenticated and subscribed, cleared on close
+        self.ready = asyncio.Event()
+        # Quoted entity IDs that state_changed events must mention to be parsed, None for all
+        self._entity_markers = None
 
     def is_open(self) -> bool:
         """Return True when the socket is connected and usable."""
@@ -70,12 +120,14 @@ class HomeAssistantWebSocket:
         """Connect to Home Assistant via WS or WSS with fallback."""
         await self.wifi.check_network_access()
         last_error = None
-        for use_ssl in (False, True):
+        # Try the transport that worked last time first, so reconnects to a TLS-only
+        # server skip the failing plain attempt
+        preferred = self.use_ssl
+        for use_ssl in (preferred, not preferred):
             try:
                 await self._open_connection(use_ssl)
                 self.use_ssl = use_ssl
                 self.connected = True
-                self._last_pong_ms = ticks_ms()
                 self.log.info("WebSocket connected")
                 return
             except Exception as e:
@@ -91,24 +143,21 @@ class HomeAssistantWebSocket:
             if use_ssl:
                 if ssl is None:
                     raise ValueError("HTTPS not supported - ssl module not available")
-                ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-                ssl_context.verify_mode = ssl.CERT_NONE
+                ssl_context = self._ssl_context
+                if ssl_context is None:
+                    # Built on first use and kept for every reconnect
+                    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+                    ssl_context.verify_mode = ssl.CERT_NONE
+                    self._ssl_context = ssl_context
                 reader, writer = await asyncio.open_connection(
                     self.host, self.port, ssl=ssl_context
                 )
             else:
                 reader, writer = await asyncio.open_connection(self.host, self.port)
+            self._set_nodelay(writer)
 
-            key = b2a_base64(urandom(16)).strip().decode()
-            request = (
-                "GET /api/websocket HTTP/1.1\r\n"
-                "Host: {}:{}\r\n"
-                "Upgrade: websocket\r\n"
-                "Connection: Upgrade\r\n"
-                "Sec-WebSocket-Version: 13\r\n"
-                "Sec-WebSocket-Key: {}\r\n\r\n"
-            ).format(self.host, self.port, key)
-            await writer.awrite(request.encode("latin-1"))
+            key = b2a_base64(urandom(16)).strip()
+            await writer.awrite(self._handshake_prefix + key + b"\r\n\r\n")
 
             status_line = await reader.readline()
             if not status_line:
@@ -140,6 +189,23 @@ class HomeAssistantWebSocket:
                     self.log.warn(f"Error while closing failed WS connection: {e}")
             raise
 
+    def _set_nodelay(self, writer) -> None:
+        """Disable Nagle's algorithm so small frames such as pings go out immediately.
+
+        Best effort, as not every port exposes the socket or the option.
+        """
+        if socket is None or not hasattr(socket, "TCP_NODELAY"):
+            return
+        try:
+            sock = writer.get_extra_info("socket")
+        except Exception:
+            # MicroPython streams only expose the peer name, so use the wrapped socket
+            sock = getattr(writer, "s", None)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
+
     async def authenticate(self) -> None:
         """Perform Home Assistant token authentication over WebSocket."""
         msg = await self.receive_json()
@@ -168,12 +234,11 @@ class HomeAssistantWebSocket:
 
         Use wait_for_result=True to validate the HA subscription response.
         """
-        payload = {"id": self._message_id, "type": "subscribe_events"}
+        message_id = self._take_message_id()
+        payload = {"id": message_id, "type": "subscribe_events"}
         if event_type:
             payload["event_type"] = event_type
         await self.send_json(payload)
-        message_id = self._message_id
-        self._message_id += 1
 
         if wait_for_result:
             await self._wait_for_result(message_id, timeout_s)
@@ -182,11 +247,16 @@ class HomeAssistantWebSocket:
 
     async def _wait_for_result(self, message_id: int, timeout_s: int = 10) -> None:
         """Wait for a matching Home Assistant result response."""
-        start_ms = ticks_ms()
+        try:
+            await asyncio.wait_for(self._receive_result(message_id), timeout_s)
+        except asyncio.TimeoutError:
+            raise ValueError("Timed out waiting for subscribe_events result")
+
+    async def _receive_result(self, message_id: int) -> None:
+        """Receive messages until the result for message_id arrives."""
+        receive_json = self.receive_json
         while True:
-            if ticks_diff(ticks_ms(), start_ms) > (timeout_s * 1000):
-                raise ValueError("Timed out waiting for subscribe_events result")
-            msg = await self.receive_json()
+            msg = await receive_json()
             if msg is None:
                 continue
             if msg.get("type") == "result" and msg.get("id") == message_id:
@@ -199,25 +269,53 @@ class HomeAssistantWebSocket:
         data = dumps(payload)
         await self._send_frame(data)
 
+    def set_entity_filter(self, entity_ids) -> None:
+        """Only parse state_changed events that mention one of entity_ids.
+
+        Pass None to receive every event.
+        """
+        if entity_ids is None:
+            self._entity_markers = None
+        else:
+            self._entity_markers = [f'"{entity_id}"'.encode() for entity_id in entity_ids]
+
     async def receive_json(self):
-        """Receive a JSON message and update activity time."""
-        data = await self._read_text_frame()
-        if not data:
-            return None
+        """Receive a JSON message and update activity time.
+
+        state_changed events for entities outside the entity filter are
+        skipped before parsing.
+        """
+        while True:
+            data = await self._read_text_frame()
+            if not data:
+                return None
+            markers = self._entity_markers
+            if markers is None or b'"state_changed"' not in data:
+                break
+            for marker in markers:
+                if marker in data:
+                    break
+            else:
+                continue
+            break
         msg = loads(data)
         if msg.get("type") == "pong":
-            self._last_pong_ms = ticks_ms()
+            self._pong_received.set()
         return msg
 
     async def listen(self, handler) -> None:
         """Continuously receive messages and invoke handler."""
+        # Bound once, as this loop runs for every message received
+        receive_json = self.receive_json
+        listen_timeout_ms = self.listen_timeout_s * 1000
         last_msg_ms = ticks_ms()
         while True:
-            msg = await self.receive_json()
+            msg = await receive_json()
             if msg is None:
-                if ticks_diff(ticks_ms(), last_msg_ms) > (self.listen_timeout_s * 1000):
+                # An empty frame has already been read off the socket, so go straight
+                # back to waiting on the next one rather than sleeping first
+                if ticks_diff(ticks_ms(), last_msg_ms) > listen_timeout_ms:
                     raise ValueError("WebSocket listen timeout")
-                await asyncio.sleep(self.poll_interval_s)
                 continue
             last_msg_ms = ticks_ms()
             await handler(msg)
@@ -238,12 +336,16 @@ class HomeAssistantWebSocket:
                 backoff = self.reconnect_initial_delay_s
                 if event_type is not None:
                     await self.subscribe_events(event_type, wait_for_result=True)
-                listen_task = asyncio.create_task(self.listen(handler))
-                keepalive_task = asyncio.create_task(self._keepalive_loop())
-                while True:
-                    if listen_task.done() or keepalive_task.done():
-                        break
-                    await asyncio.sleep(self.poll_interval_s)
+                self.ready.set()
+                # Sleep until either task finishes rather than polling them
+                task_finished = asyncio.Event()
+                listen_task = asyncio.create_task(
+                    self._set_when_done(self.listen(handler), task_finished)
+                )
+                keepalive_task = asyncio.create_task(
+                    self._set_when_done(self._keepalive_loop(), task_finished)
+                )
+                await task_finished.wait()
 
                 listen_exc = None
                 keepalive_exc = None
@@ -291,10 +393,19 @@ class HomeAssistantWebSocket:
                         self.log.warn(f"Error while awaiting keepalive task cleanup: {e}")
                 await self.close()
 
-            self.log.info(f"Reconnecting in {backoff}s")
-            await asyncio.sleep(backoff)
+            # Spread the delay over 0.5x to 1.5x of backoff so clients don't reconnect in lockstep
+            delay = backoff * (0.5 + urandom(1)[0] / 255)
+            self.log.info(f"Reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
             backoff = min(backoff * 2, self.reconnect_max_delay_s)
 
+    async def _set_when_done(self, coro, event) -> None:
+        """Run coro, setting event when it finishes for any reason."""
+        try:
+            await coro
+        finally:
+            event.set()
+
     async def close(self) -> None:
         """Close the WebSocket connection gracefully."""
         if self.writer:
@@ -319,6 +430,7 @@ class HomeAssistantWebSocket:
                             await result
             except Exception as e:
                 self.log.warn(f"Error while closing WebSocket writer: {e}")
+        self.ready.clear()
         self.connected = False
         self.reader = None
         self.writer = None
@@ -326,26 +438,38 @@ class HomeAssistantWebSocket:
     async def _keepalive_loop(self) -> None:
         """Send periodic pings and enforce a timeout window."""
         while self.is_open():
-            ping_sent_ms = ticks_ms()
-            await self.send_json({"id": self._message_id, "type": "ping"})
-            self._message_id = self._next_message_id()
-            while self.is_open():
-                if ticks_diff(ticks_ms(), ping_sent_ms) > (self.pong_timeout_s * 1000):
-                    raise ValueError("WebSocket pong timeout")
-                if ticks_diff(self._last_pong_ms, ping_sent_ms) >= 0:
-                    break
-                await asyncio.sleep(self.poll_interval_s)
+            self._pong_received.clear()
+            await self.send_json({"id": self._take_message_id(), "type": "ping"})
+            try:
+                await asyncio.wait_for(self._pong_received.wait(), self.pong_timeout_s)
+            except asyncio.TimeoutError:
+                raise ValueError("WebSocket pong timeout")
             await asyncio.sleep(self.ping_interval_s)
 
     async def _send_close(self) -> None:
         """Send a WebSocket close frame."""
-        await self._send_frame(b"", opcode=0x8)
+        if not self.writer:
+            raise ValueError("WebSocket not connected")
+        async with self._write_lock:
+            await self.writer.awrite(_CLOSE_FRAME)
 
     async def _send_frame(self, payload, opcode: int = 0x1) -> None:
-        """Encode and send a WebSocket frame with masking."""
+        """Encode and send a WebSocket frame with masking, one frame at a time."""
+        async with self._write_lock:
+            await self._write_frame(payload, opcode)
+
+    async def _send_pong(self, payload) -> None:
+        """Reply to a server ping, logging rather than raising as nothing awaits this."""
+        try:
+            await self._send_frame(payload, opcode=0xA)
+        except Exception as e:
+            self.log.warn(f"Error while sending WebSocket pong: {e}")
+
+    async def _write_frame(self, payload, opcode: int) -> None:
+        """Encode and send a WebSocket frame; callers must hold the write lock."""
         if not self.writer:
             raise ValueError("WebSocket not connected")
-        if isinstance(payload, bytes):
+        if isinstance(payload, (bytes, bytearray)):
             payload_bytes = payload
         else:
             payload_bytes = str(payload).encode("utf-8")
@@ -353,100 +477,137 @@ class HomeAssistantWebSocket:
 
         first_byte = 0x80 | (opcode & 0x0F)
         mask_bit = 0x80
-        header = bytearray()
-        header.append(first_byte)
-
         if length <= 125:
-            header.append(mask_bit | length)
+            # Short form, which every message this client sends normally fits
+            header_len = 6
         elif length <= 0xFFFF:
-            header.append(mask_bit | 126)
-            header.extend(length.to_bytes(2, "big"))
+            header_len = 8
         else:
-            header.append(mask_bit | 127)
-            header.extend(length.to_bytes(8, "big"))
-
-        mask_key = urandom(4)
-        header.extend(mask_key)
-
-        masked = bytearray(payload_bytes)
-        for i in range(length):
-            masked[i] ^= mask_key[i % 4]
-
-        await self.writer.awrite(header)
-        if length:
-            await self.writer.awrite(masked)
-
-    def _next_message_id(self) -> int:
-        """Return next message id, wrapping to avoid unbounded growth."""
-        next_id = self._message_id + 1
-        if next_id > 2000000000:
-            next_id = 1
-        return next_id
-
-    async def _read_exact(self, nbytes: int) -> bytes:
-        """Read exactly nbytes from the socket with a timeout."""
-        data = b""
-        start_ms = ticks_ms()
-        empty_reads = 0
-        while len(data) < nbytes:
-            if self.reader is None:
-                raise ValueError("WebSocket not connected")
-            chunk = await self.reader.read(nbytes - len(data))
-            if not chunk:
-                if ticks_diff(ticks_ms(), start_ms) > (self.read_timeout_s * 1000):
-                    raise ValueError("WebSocket read timeout")
-                empty_reads += 1
-                sleep_time = 0.05 * empty_reads
-                if sleep_time > 0.5:
-                    sleep_time = 0.5
-                await asyncio.sleep(sleep_time)
-                continue
-            empty_reads = 0
-            data += chunk
+            header_len = 14
+
+        # Build the frame in one buffer, offset so the payload starts on a word
+        # boundary and can be masked in place, then send it in a single write
+        start = -header_len % 4
+        payload_start = start + header_len
+        end = payload_start + length
+        # Small frames reuse the scratch buffer, which the write lock keeps to one frame at a time
+        use_scratch = length <= _TX_SCRATCH_PAYLOAD
+        if use_scratch:
+            frame = self._tx_buf
+            view = self._tx_view
+        else:
+            frame = bytearray(end)
+            view = memoryview(frame)
+        # Pack the header straight into the frame, without intermediate length bytes
+        if header_len == 6:
+            pack_into("!BB", frame, start, first_byte, mask_bit | length)
+        elif header_len == 8:
+            pack_into("!BBH", frame, start, first_byte, mask_bit | 126, length)
+        else:
+            pack_into("!BBQ", frame, start, first_byte, mask_bit | 127, length)
+
+        frame[payload_start:end] = payload_bytes
+        # Masking only protects plaintext connections from proxy cache poisoning,
+        # which TLS already prevents, so send a zero key and skip the XOR there
+        if length and not self.use_ssl:
+            # Frame masks come from the seeded PRNG, keeping the slower hardware
+            # RNG behind urandom for the handshake key
+            mask_key = getrandbits(32).to_bytes(4, "big")
+            frame[payload_start - 4:payload_start] = mask_key
+            _apply_mask(view[payload_start:end], mask_key)
+        else:
+            # A zero key leaves the payload unchanged, and clears any key left in the scratch buffer
+            frame[payload_start - 4:payload_start] = _ZERO_MASK_KEY
+
+        await self.writer.awrite(view[start:end])
+
+    def _take_message_id(self) -> int:
+        """Return the next message id and advance the counter."""
+        message_id = self._message_id
+        self._message_id = message_id + 1
+        return message_id
+
+    async def _read_exact(self, nbytes: int) -> bytearray:
+        """Read exactly nbytes from the socket into a new buffer."""
+        # Read straight into one buffer rather than concatenating chunks
+        data = bytearray(nbytes)
+        await self._read_into(memoryview(data))
         return data
 
+    async def _read_into(self, view) -> None:
+        """Fill a memoryview from the socket, raising if the connection closes first."""
+        nbytes = len(view)
+        received = 0
+        reader = self.reader
+        if reader is None:
+            raise ValueError("WebSocket not connected")
+        # Bound once, as a frame can take several reads
+        readinto = reader.readinto
+        while received < nbytes:
+            count = await readinto(view[received:])
+            if not count:
+                # readinto waits for data, so an empty read means the server has gone
+                raise ValueError("WebSocket connection closed")
+            received += count
+
     async def _read_frame(self) -> tuple:
         """Read a raw WebSocket frame and return (opcode, payload)."""
         if not self.reader:
             raise ValueError("WebSocket not connected")
 
-        first_two = await self._read_exact(2)
-        b1, b2 = first_two[0], first_two[1]
+        # Header fields are read into the reusable header buffer, leaving the
+        # payload as the only allocation per frame
+        rx_header = self._rx_header
+        # Waiting for the start of a frame is idle time, which the keepalive polices
+        await self._read_into(rx_header[:2])
+        try:
+            return await asyncio.wait_for(
+                self._read_frame_rest(rx_header[0], rx_header[1]), self.read_timeout_s
+            )
+        except asyncio.TimeoutError:
+            raise ValueError("WebSocket read timeout")
+
+    async def _read_frame_rest(self, b1: int, b2: int) -> tuple:
+        """Read the rest of a frame after its first two bytes and return (opcode, payload)."""
+        rx_header = self._rx_header
         opcode = b1 & 0x0F
         masked = (b2 & 0x80) != 0
         length = b2 & 0x7F
 
         if length == 126:
-            length_bytes = await self._read_exact(2)
-            length = int.from_bytes(length_bytes, "big")
+            await self._read_into(rx_header[:2])
+            length = int.from_bytes(rx_header[:2], "big")
         elif length == 127:
-            length_bytes = await self._read_exact(8)
-            length = int.from_bytes(length_bytes, "big")
+            await self._read_into(rx_header)
+            length = int.from_bytes(rx_header, "big")
 
         mask_key = b""
         if masked:
-            mask_key = await self._read_exact(4)
+            await self._read_into(rx_header[:4])
+            mask_key = bytes(rx_header[:4])
 
         payload = await self._read_exact(length) if length > 0 else b""
         if masked and length > 0:
-            unmasked = bytearray(payload)
-            for i in range(length):
-                unmasked[i] ^= mask_key[i % 4]
-            payload = bytes(unmasked)
+            # The payload is a fresh bytearray, so unmask it in place
+            _apply_mask(payload, mask_key)
 
         return opcode, payload
 
-    async def _read_text_frame(self) -> str:
-        """Read until a text frame is received, handling control frames."""
+    async def _read_text_frame(self) -> bytearray:
+        """Read until a text frame is received, handling control frames.
+
+        Returns the raw UTF-8 payload, which loads accepts without decoding to str.
+        """
         while True:
             opcode, payload = await self._read_frame()
             if opcode == 0x8:
                 raise ValueError("WebSocket closed by server")
             if opcode == 0x9:
-                await self._send_frame(payload, opcode=0xA)
+                # Reply from a separate task so events behind the ping are not held up
+                asyncio.create_task(self._send_pong(payload))
                 continue
             if opcode == 0xA:
                 continue
             if opcode != 0x1:
                 continue
-            return payload.decode("utf-8")
+            return payload
@@ -1,5 +1,18 @@
 from lib.ulogging import uLogger
-from machine import Pin
+from machine import Pin, mem32
+from sys import implementation
+
+# SIO registers that atomically set or clear GPIO outputs for every pin in a
+# bitmask, letting several LEDs be switched with a single write
+_SIO_BASE = 0xd0000000
+if "RP2350" in implementation._machine:
+    _GPIO_OUT_SET = _SIO_BASE + 0x018
+    _GPIO_OUT_CLR = _SIO_BASE + 0x020
+else:
+    _GPIO_OUT_SET = _SIO_BASE + 0x014
+    _GPIO_OUT_CLR = _SIO_BASE + 0x018
+
+_PIN_OUT = Pin.OUT
 
 
 class PhysicalComponent:
@@ -20,12 +33,14 @@ class PhysicalComponent:
         self.pin = pin_number
         self.name = name
         self.pin_obj = None
+        self._set_value = None  # Bound pin_obj.value for LEDs, saving the lookups on each write
         self.state = False  # For LEDs
         
         # Initialize the GPIO pin based on type
         if component_type == "led":
-            self.pin_obj = Pin(pin_number, Pin.OUT)
-            self.pin_obj.value(0)  # Start with LED off
+            self.pin_obj = Pin(pin_number, _PIN_OUT)
+            self._set_value = self.pin_obj.value
+            self._set_value(0)  # Start with LED off
         elif component_type == "button":
             # Buttons are managed by the Button class elsewhere
             pass
@@ -38,6 +53,9 @@ class PhysicalLayout:
         """Initialize the physical layout manager."""
         self.logger = uLogger("PhysicalLayout")
         self.components = {}  # {component_id: PhysicalComponent}
+        self._pin_to_id = {}  # {pin_number: component_id}
+        self._leds = {}  # {component_id: PhysicalComponent} for LEDs only
+        self._buttons = {}  # {component_id: PhysicalComponent} for buttons only
         self.logger.info("PhysicalLayout initialized")
     
     def register_component(self, component_id: str, component_type: str, 
@@ -63,44 +81,83 @@ class PhysicalLayout:
             )
         
         # Check for duplicate pin number
-        for existing_id, existing_comp in self.components.items():
-            if existing_comp.pin == pin_number:
-                raise ValueError(
-                    f"Pin {pin_number} is already in use by component '{existing_id}' ({existing_comp.name}). "
-                    f"Use deregister_component('{existing_id}') to free the pin, or use a different pin."
-                )
+        existing_id = self._pin_to_id.get(pin_number)
+        if existing_id is not None:
+            existing_comp = self.components[existing_id]
+            raise ValueError(
+                f"Pin {pin_number} is already in use by component '{existing_id}' ({existing_comp.name}). "
+                f"Use deregister_component('{existing_id}') to free the pin, or use a different pin."
+            )
         
         component = PhysicalComponent(component_id, component_type, pin_number, name)
         self.components[component_id] = component
+        self._pin_to_id[pin_number] = component_id
+        if component_type == "led":
+            self._leds[component_id] = component
+        elif component_type == "button":
+            self._buttons[component_id] = component
         
-        self.logger.info(f"Registered {component_type} '{component_id}' ({name}) on pin {pin_number}")
+        if self.logger.info_enabled:
+            self.logger.info(f"Registered {component_type} '{component_id}' ({name}) on pin {pin_number}")
     
-    def deregister_component(self, component_id: str) -> bool:
+    def deregister_component(self, component_id: str, turn_off: bool = True) -> bool:
         """
         Remove a physical hardware component from the registry.
         
         Args:
             component_id: The unique identifier of the component to remove
+            turn_off: Set False to leave an LED's pin as it is rather than turning it off
             
         Returns:
             True if component was removed, False if not found
         """
-        if component_id in self.components:
-            component = self.components[component_id]
-            
-            # Clean up GPIO if it's an LED
-            if component.type == "led" and component.pin_obj:
-                try:
-                    component.pin_obj.value(0)  # Turn off before removing
-                except Exception as e:
-                    self.logger.warn(f"Error turning off LED during deregister: {e}")
-            
-            del self.components[component_id]
-            self.logger.info(f"Deregistered {component.type} '{component_id}' from pin {component.pin}")
-            return True
-        else:
-            self.logger.warn(f"Component '{component_id}' not found for deregistration")
+        # Pop rather than test and then fetch, so the ID is only looked up once
+        component = self.components.pop(component_id, None)
+        if component is None:
+            if self.logger.warn_enabled:
+                self.logger.warn(f"Component '{component_id}' not found for deregistration")
             return False
+        
+        # Clean up GPIO if it's an LED
+        if turn_off and component.type == "led" and component.pin_obj:
+            try:
+                component.pin_obj.value(0)  # Turn off before removing
+            except Exception as e:
+                self.logger.warn(f"Error turning off LED during deregister: {e}")
+        
+        del self._pin_to_id[component.pin]
+        self._leds.pop(component_id, None)
+        self._buttons.pop(component_id, None)
+        if self.logger.info_enabled:
+            self.logger.info(f"Deregistered {component.type} '{component_id}' from pin {component.pin}")
+        return True
+    
+    def deregister_all(self, turn_off: bool = True) -> None:
+        """
+        Remove every physical hardware component from the registry, turning
+        LEDs off with a single GPIO clear operation rather than one write each.
+        
+        Args:
+            turn_off: Set False to leave the LED pins as they are
+        """
+        if turn_off:
+            off_mask = 0
+            for led in self._leds.values():
+                if led.pin >= 32:
+                    # Outside the low GPIO bank, write the pin directly
+                    led._set_value(0)
+                else:
+                    off_mask |= 1 << led.pin
+            if off_mask:
+                mem32[_GPIO_OUT_CLR] = off_mask
+        
+        count = len(self.components)
+        self.components.clear()
+        self._pin_to_id.clear()
+        self._leds.clear()
+        self._buttons.clear()
+        if self.logger.info_enabled:
+            self.logger.info(f"Deregistered all {count} components")
     
     def get_component(self, component_id: str) -> PhysicalComponent | None:
         """
@@ -124,10 +181,7 @@ class PhysicalLayout:
         Returns:
             PhysicalComponent instance or None if not found or not an LED
         """
-        component = self.components.get(component_id)
-        if component and component.type == "led":
-            return component
-        return None
+        return self._leds.get(component_id)
     
     def get_button(self, component_id: str) -> PhysicalComponent | None:
         """
@@ -139,10 +193,7 @@ class PhysicalLayout:
         Returns:
             PhysicalComponent instance or None if not found or not a button
         """
-        component = self.components.get(component_id)
-        if component and component.type == "button":
-            return component
-        return None
+        return self._buttons.get(component_id)
     
     def set_led_state(self, component_id: str, state: bool) -> bool:
         """
@@ -155,16 +206,47 @@ class PhysicalLayout:
         Returns:
             True if successful, False if component not found or not an LED
         """
-        led = self.get_led(component_id)
+        led = self._leds.get(component_id)
         if led is None:
             return False
         
         led.state = state
-        if led.pin_obj:
-            led.pin_obj.value(1 if state else 0)
+        # Pin.value takes any truthy value, so the bool is passed as is
+        led._set_value(state)
         
         return True
     
+    def set_led_states(self, component_ids: list, states: list) -> None:
+        """
+        Set the physical state of several LEDs at once, writing all pins in
+        a single GPIO set and a single GPIO clear operation.
+        
+        Args:
+            component_ids: The unique identifiers of the LEDs
+            states: Matching list of states, True for on, False for off
+        """
+        on_mask = 0
+        off_mask = 0
+        get_led = self._leds.get
+        for i in range(len(component_ids)):
+            led = get_led(component_ids[i])
+            if led is None:
+                continue
+            state = states[i]
+            led.state = state
+            if led.pin >= 32:
+                # Outside the low GPIO bank, write the pin directly
+                led._set_value(state)
+            elif state:
+                on_mask |= 1 << led.pin
+            else:
+                off_mask |= 1 << led.pin
+        
+        if on_mask:
+            mem32[_GPIO_OUT_SET] = on_mask
+        if off_mask:
+            mem32[_GPIO_OUT_CLR] = off_mask
+    
     def get_led_state(self, component_id: str) -> bool:
         """
         Get the current state of an LED.
@@ -187,7 +269,7 @@ class PhysicalLayout:
         Returns:
             List of PhysicalComponent instances that are LEDs
         """
-        return [c for c in self.components.values() if c.type == "led"]
+        return list(self._leds.values())
     
     def get_all_buttons(self) -> list:
         """
@@ -196,7 +278,7 @@ class PhysicalLayout:
         Returns:
             List of PhysicalComponent instances that are buttons
         """
-        return [c for c in self.components.values() if c.type == "button"]
+        return list(self._buttons.values())
     
     def component_exists(self, component_id: str) -> bool:
         """
@@ -220,7 +302,7 @@ class PhysicalLayout:
         Returns:
             True if pin is in use, False otherwise
         """
-        return any(comp.pin == pin_number for comp in self.components.values())
+        return pin_number in self._pin_to_id
     
     def get_component_by_pin(self, pin_number: int) -> PhysicalComponent | None:
         """
@@ -232,7 +314,7 @@ class PhysicalLayout:
         Returns:
             PhysicalComponent instance or None if pin not in use
         """
-        for component in self.components.values():
-            if component.pin == pin_number:
-                return component
-        return None
+        component_id = self._pin_to_id.get(pin_number)
+        if component_id is None:
+            return None
+        return self.components[component_id]
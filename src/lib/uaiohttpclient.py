@@ -1,4 +1,5 @@
 import asyncio
+from utime import ticks_ms, ticks_diff
 try:
     import ssl
 except ImportError:
@@ -63,7 +64,7 @@ async def _close_writer(writer):
         await wait_closed()  # type: ignore
 
 
-async def request_raw(method, url, headers=None, json_data: str = ""):
+def _parse_url(url):
     try:
         proto, dummy, host, path = url.split("/", 3)
     except ValueError:
@@ -79,23 +80,25 @@ async def request_raw(method, url, headers=None, json_data: str = ""):
         else:
             port = 80
 
-    # Determine if SSL is needed
-    use_ssl = False
+    if proto not in ("http:", "https:"):
+        raise ValueError("Unsupported protocol: " + proto)
+    return proto, host, port, path
+
+
+async def _open_connection(proto, host, port):
+    # Open connection with or without SSL
     if proto == "https:":
         if ssl is None:
             raise ValueError("HTTPS not supported - ssl module not available")
-        use_ssl = True
-    elif proto != "http:":
-        raise ValueError("Unsupported protocol: " + proto)
-    
-    # Open connection with or without SSL
-    if use_ssl:
-        assert ssl is not None
         ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
         ssl_context.verify_mode = ssl.CERT_NONE  # Skip certificate verification for simplicity
-        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
-    else:
-        reader, writer = await asyncio.open_connection(host, port)
+        return await asyncio.open_connection(host, port, ssl=ssl_context)
+    return await asyncio.open_connection(host, port)
+
+
+async def request_raw(method, url, headers=None, json_data: bytes = b""):
+    proto, host, port, path = _parse_url(url)
+    reader, writer = await _open_connection(proto, host, port)
     headers_string = ""
     if headers:
         for key, value in headers.items():
@@ -104,18 +107,20 @@ async def request_raw(method, url, headers=None, json_data: str = ""):
     # transfer-encoding But explicitly set Connection: close, even
     # though this should be default for 1.0, because some servers
     # misbehave w/o it.
-    query = "%s /%s HTTP/1.0\r\nHost: %s\r\nConnection: close\r\nUser-Agent: compat\r\n%s\r\n%s" % (
+    query = "%s /%s HTTP/1.0\r\nHost: %s\r\nConnection: close\r\nUser-Agent: compat\r\n%s\r\n" % (
         method,
         path,
         host,
-        headers_string,
-        json_data
+        headers_string
     )
     await writer.awrite(query.encode("latin-1"))
+    # The body is already encoded, write it as is rather than copying it into the query
+    if json_data:
+        await writer.awrite(json_data)
     return reader, writer
 
 
-async def request(method, url, headers=None, json_data: str = ""):
+async def request(method, url, headers=None, json_data: bytes = b""):
     redir_cnt = 0
     while redir_cnt < 2:
         reader, writer = await request_raw(method, url, headers, json_data)
@@ -148,3 +153,185 @@ async def request(method, url, headers=None, json_data: str = ""):
     resp.status = status
     resp.headers = response_headers
     return resp
+
+
+# Methods that are safe to send again when a reused connection dies mid-request
+_IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+class _StaleConnection(OSError):
+    """
+    A reused connection was found closed. request_sent is False when the server
+    cannot have acted on the request, either because it was not fully written
+    or because the connection closed without any response, so it is safe to
+    send again.
+    """
+    def __init__(self, message, request_sent):
+        super().__init__(message)
+        self.request_sent = request_sent
+
+
+class ClientSession:
+    """
+    HTTP/1.1 client that keeps one connection per host open between requests,
+    so repeated calls skip the TCP and TLS handshakes. Requests on a session
+    are serialised, and redirects are not followed. Each request, including
+    opening its connection, is limited to timeout_s so a half-open socket
+    cannot hold the session forever. Connections idle for longer than
+    max_idle_s are not reused, as servers close idle connections (Home
+    Assistant after 75 seconds) and a POST sent on one could not be retried.
+    """
+
+    def __init__(self, timeout_s=10, max_idle_s=30):
+        self._connections = {}  # {(proto, host, port): ((reader, writer), ticks_ms when last used)}
+        self._lock = asyncio.Lock()
+        self.timeout_s = timeout_s
+        self.max_idle_ms = max_idle_s * 1000
+
+    async def request(self, method, url, headers=None, json_data: bytes = b""):
+        proto, host, port, path = _parse_url(url)
+        key = (proto, host, port)
+        async with self._lock:
+            connection = None
+            pooled = self._connections.pop(key, None)
+            if pooled is not None:
+                connection, last_used_ms = pooled
+                if ticks_diff(ticks_ms(), last_used_ms) > self.max_idle_ms:
+                    try:
+                        await _close_writer(connection[1])
+                    except Exception:
+                        pass
+                    connection = None
+            if connection is not None:
+                try:
+                    return await asyncio.wait_for(
+                        self._exchange(key, connection, method, host, path, headers, json_data),
+                        self.timeout_s
+                    )
+                except _StaleConnection as e:
+                    # The server closed the idle connection. Retry once on a new one,
+                    # unless the request may already have been acted on and repeating
+                    # it is not safe, such as a toggle
+                    if e.request_sent and method not in _IDEMPOTENT_METHODS:
+                        raise
+            return await asyncio.wait_for(
+                self._open_and_exchange(key, proto, host, port, method, path, headers, json_data),
+                self.timeout_s
+            )
+
+    async def _open_and_exchange(self, key, proto, host, port, method, path, headers, json_data):
+        connection = await _open_connection(proto, host, port)
+        return await self._exchange(key, connection, method, host, path, headers, json_data)
+
+    async def _exchange(self, key, connection, method, host, path, headers, json_data):
+        reader, writer = connection
+        try:
+            headers_string = ""
+            if headers:
+                for name, value in headers.items():
+                    headers_string += f"{name}: {value}\r\n"
+            query = "%s /%s HTTP/1.1\r\nHost: %s\r\nUser-Agent: compat\r\n%s\r\n" % (
+                method,
+                path,
+                host,
+                headers_string
+            )
+            try:
+                await writer.awrite(query.encode("latin-1"))
+                if json_data:
+                    await writer.awrite(json_data)
+            except OSError as e:
+                # Without the whole request the server cannot have acted on it
+                raise _StaleConnection(f"Connection closed before request was sent: {e}", False)
+            try:
+                sline = await reader.readline()
+            except OSError as e:
+                raise _StaleConnection(f"Connection closed before response: {e}", True)
+            if not sline:
+                # Closed without a single response byte, which is how a server drops
+                # an idle keep-alive connection without reading the request
+                raise _StaleConnection("Connection closed before response", False)
+            status = int(sline.split(None, 2)[1])
+
+            response_headers = []
+            content_length = None
+            chunked = False
+            keep_alive = True
+            while True:
+                line = await reader.readline()
+                if not line or line == b"\r\n":
+                    break
+                response_headers.append(line)
+                name, value = line.split(b":", 1)
+                name = name.strip().lower()
+                value = value.strip().lower()
+                if name == b"content-length":
+                    content_length = int(value)
+                elif name == b"transfer-encoding":
+                    chunked = b"chunked" in value
+                elif name == b"connection":
+                    keep_alive = value != b"close"
+
+            if method == "HEAD" or status in (204, 304):
+                body = b""
+            elif chunked:
+                body = await self._read_chunked(reader)
+            elif content_length is not None:
+                body = await reader.readexactly(content_length)
+            else:
+                # No framing, the body runs until the server closes the connection
+                body = await reader.read(-1)
+                keep_alive = False
+        except BaseException:
+            await _close_writer(writer)
+            raise
+
+        if keep_alive:
+            self._connections[key] = (connection, ticks_ms())
+        else:
+            await _close_writer(writer)
+
+        resp = BufferedClientResponse(body)
+        resp.status = status
+        resp.headers = response_headers
+        return resp
+
+    async def _read_chunked(self, reader):
+        body = b""
+        while True:
+            line = await reader.readline()
+            size = int(line.split(b";", 1)[0], 16)
+            if size == 0:
+                break
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+        # Skip any trailers up to the blank line ending the message
+        while True:
+            line = await reader.readline()
+            if not line or line == b"\r\n":
+                break
+        return body
+
+    async def close(self):
+        connections = self._connections
+        self._connections = {}
+        for (reader, writer), last_used_ms in connections.values():
+            try:
+                await _close_writer(writer)
+            except Exception:
+                pass
+
+
+class BufferedClientResponse(ClientResponse):
+    def __init__(self, body):
+        self.body = body
+        self.status = 0
+        self.headers = []
+
+    async def read(self, sz=-1):
+        body = self.body
+        self.body = b""
+        return body
+
+    def __repr__(self):
+        return "<BufferedClientResponse %d %s>" % (self.status, self.headers)
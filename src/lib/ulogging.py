@@ -1,6 +1,38 @@
 from gc import mem_free
 from os import stat, remove, rename
 from time import gmtime, time
+from asyncio import sleep_ms
+
+# Handler instances are shared by every uLogger so that all modules write into
+# the same output buffers, see flush()
+_shared_handlers = {}
+
+def flush() -> None:
+    """
+    Flush any buffered log output for all configured handlers. Every handler
+    is flushed even if one fails, then the first failure is raised.
+    """
+    first_error = None
+    for handler in _shared_handlers.values():
+        try:
+            handler.flush()
+        except Exception as e:
+            if first_error is None:
+                first_error = e
+    if first_error is not None:
+        raise first_error
+
+async def periodic_flush(interval_ms: int = 100) -> None:
+    """
+    Flush buffered log output at a fixed interval so that a quiet system still
+    emits its logs promptly. Start with asyncio.create_task().
+    """
+    while True:
+        await sleep_ms(interval_ms)
+        try:
+            flush()
+        except Exception as e:
+            print(f"An error occurred while flushing log output: {e}")
 
 class uLogger:
     
@@ -28,6 +60,10 @@ class uLogger:
                 print("LOG_LEVEL not found in config.py not found. Using default log level.")
             except Exception as e:
                 print(f"An unexpected error occurred: {e}. Using default log level.")
+        
+        # Callers can check these before building an expensive log message
+        self.info_enabled = self.log_level > 3
+        self.warn_enabled = self.log_level > 2
 
     def configure_handlers(self, handlers: list) -> None:
         self.handlers = []
@@ -46,13 +82,18 @@ class uLogger:
         
         for handler in self.handlers:
             try:
-                handler_class = globals().get(handler)
+                handler_object = _shared_handlers.get(handler)
                 
-                if handler_class is None:
-                    raise ValueError(f"Handler class '{handler}' not found.")
+                if handler_object is None:
+                    handler_class = globals().get(handler)
+                    
+                    if handler_class is None:
+                        raise ValueError(f"Handler class '{handler}' not found.")
+                    
+                    handler_object = handler_class()
+                    _shared_handlers[handler] = handler_object
                 
-                handler = handler_class()
-                self.handler_objects.append(handler)
+                self.handler_objects.append(handler_object)
             except Exception as e:
                 print(f"An error occurred while confguring handler '{handler}': {e}")
                 raise
@@ -82,28 +123,66 @@ class uLogger:
     def error(self, message: str) -> None:
         if self.log_level > 1:
             self.process_handlers(self.decorate_message(message, "Error"))
+            try:
+                flush()
+            except Exception as e:
+                print(f"An error occurred while flushing log output: {e}")
 
     def critical(self, message: str) -> None:
         if self.log_level > 0:
             self.process_handlers(self.decorate_message(message, "Critical"))
+            try:
+                flush()
+            except Exception as e:
+                print(f"An error occurred while flushing log output: {e}")
 
-class Console:
-    def __init__(self) -> None:
-        pass
+class BufferedHandler:
+    """
+    Base for output handlers that accumulate log lines and pass them to the
+    write callable in a single call once the buffer fills or flush() is called.
+    """
+    def __init__(self, write) -> None:
+        self._write = write
+        self.buffer = []
+        self.buffer_bytes = 0
+        try:
+            from config import LOG_BUFFER_SIZE
+            self.LOG_BUFFER_SIZE = LOG_BUFFER_SIZE
+        except ImportError:
+            self.LOG_BUFFER_SIZE = 512
     
     def emit(self, message) -> None:
-        print(message)
+        self.buffer.append(message)
+        self.buffer_bytes += len(message) + 1
+        if self.buffer_bytes >= self.LOG_BUFFER_SIZE:
+            self.flush()
+    
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        output = "\n".join(self.buffer) + "\n"
+        self.buffer = []
+        self.buffer_bytes = 0
+        self._write(output)
 
-class File:
+def _print_output(output: str) -> None:
+    print(output, end="")
+
+class Console(BufferedHandler):
+    def __init__(self) -> None:
+        super().__init__(_print_output)
+
+class File(BufferedHandler):
     def __init__(self) -> None:
+        super().__init__(self.write)
         self.log_file = "log.txt"
         self.second_log_file = "log2.txt"
         from config import LOG_FILE_MAX_SIZE
         self.LOG_FILE_MAX_SIZE = LOG_FILE_MAX_SIZE
     
-    def emit(self, message) -> None:
+    def write(self, output: str) -> None:
         with open(self.log_file, "a") as log_file:
-            log_file.write(message + "\n")
+            log_file.write(output)
         self.check_for_rotate()
 
     def check_for_rotate(self) -> None:
@@ -123,6 +202,7 @@ class File:
         """ 
         Read both log files and return their contents as a single string.
         """
+        self.flush()
         logs = ""
         try:
             with open(self.second_log_file, "r") as log_file:
@@ -0,0 +1,28 @@
+"""
+WebSocket payload masking compiled to machine code with the viper emitter.
+Kept in its own module as viper code will not compile on builds without a
+native emitter; importers should fall back to a Python implementation if the
+import fails.
+"""
+
+import micropython
+
+
+@micropython.viper
+def mask_in_place(buf, length: int, mask_key, key_word: int):
+    # XOR buf with the 4 byte mask a word at a time, key_word being mask_key
+    # packed in native byte order, then finish the trailing bytes singly.
+    # buf's data must start on a word boundary: a bytearray, or a memoryview
+    # slice of one that begins at an offset which is a multiple of 4.
+    words = ptr32(buf)
+    nwords = length >> 2
+    i = 0
+    while i < nwords:
+        words[i] = words[i] ^ key_word
+        i += 1
+    data = ptr8(buf)
+    key = ptr8(mask_key)
+    i = nwords << 2
+    while i < length:
+        data[i] = data[i] ^ key[i & 3]
+        i += 1
@@ -0,0 +1,31 @@
+"""
+Tests for the static file path checks in src/http/lib/url_path.py.
+
+The module is loaded from its file path because the src/http package name
+clashes with the standard library http package under CPython.
+"""
+import importlib.util
+import os
+
+import pytest
+
+_URL_PATH_FILE = os.path.join(os.path.dirname(__file__), '..', 'src', 'http', 'lib', 'url_path.py')
+_spec = importlib.util.spec_from_file_location('ha_dash_url_path', _URL_PATH_FILE)
+url_path = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(url_path)
+
+
+@pytest.mark.parametrize('path', ['%-1', '%+f', '% 1', 'x%-1y', '%-f%20'])
+def test_signed_and_space_padded_escapes_are_left_undecoded(path):
+    decoded = url_path.url_decode(path)
+    assert decoded.startswith(path[:path.index('%') + 3])
+    assert url_path.is_safe_path(path)
+
+
+@pytest.mark.parametrize('path', ['css/%2e%2e/x', '%252e%252e/x', '%2F%2Fetc'])
+def test_encoded_traversal_is_rejected(path):
+    assert not url_path.is_safe_path(path)
+
+
+def test_hex_escapes_are_decoded():
+    assert url_path.url_decode('a%41b%2fc') == 'aAb/c'